@@ -1,31 +1,1102 @@
-from httpx import Client, HTTPError
-from dataclasses import dataclass
+from httpx import Client, AsyncClient, HTTPError
+from dataclasses import dataclass, field
+import asyncio
+import threading
+import sqlite3
+import hmac
+import hashlib
+import base64
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import json
+import re
 import os
+import io
+import gzip
 import pandas as pd
 from urllib.parse import urljoin
-from datetime import datetime
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import numpy as np
 import httpx
 import time
 import ast
+import shutil
+import multiprocessing
 from glob import glob
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet support is optional
+    pa = None
+    pc = None
+    pq = None
+
+try:
+    import orjson
+except ImportError:  # JSONL falls back to the json module
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # .zst JSONL support is optional
+    zstandard = None
 
 pd.options.display.max_columns = 100
 
+# Columns of the product table produced by fetch_all_products_with_filter()
+PRODUCT_CSV_COLUMNS = [
+    'ID', 'Handle', 'Title', 'Body (HTML)', 'Vendor', 'Product Category', 'Type', 'Tags', 'Published',
+    'Option1 Name', 'Option1 Value', 'Option1 Linked To',
+    'Option2 Name', 'Option2 Value', 'Option2 Linked To',
+    'Option3 Name', 'Option3 Value', 'Option3 Linked To',
+    'Variant SKU', 'Variant Grams', 'Variant Inventory Tracker',
+    'Variant Inventory Policy', 'Variant Fulfillment Service',
+    'Variant Price', 'Variant Compare At Price', 'Variant Requires Shipping',
+    'Variant Taxable', 'Variant Barcode', 'Image Src', 'Image Position',
+    'Image Alt Text', 'Gift Card', 'SEO Title', 'SEO Description',
+    'Variant Image', 'Variant Weight Unit', 'Cost per item', 'Available Qty',
+    'Status', 'Vendor SKU',
+    'enable_best_price (product.metafields.custom.enable_best_price)',
+    'arrives_before_christmas (product.metafields.custom.arrives_before_christmas)',
+    'info_meta_text (product.metafields.custom.info_meta_text)'
+]
+
+# Shopify rejects a single query whose requested cost exceeds this
+MAX_QUERY_COST = 1000
+
+# Product fields that can be requested from the product readers, and their selection
+PRODUCT_FIELD_SELECTIONS = {
+    'id': 'id',
+    'handle': 'handle',
+    'title': 'title',
+    'description': 'description',
+    'descriptionHtml': 'descriptionHtml',
+    'seo': 'seo { title description }',
+    'vendor': 'vendor',
+    'productType': 'productType',
+    'tags': 'tags',
+    'status': 'status',
+    'createdAt': 'createdAt',
+    'updatedAt': 'updatedAt',
+    'seoTitle': 'seoTitle: metafield(key: "title", namespace: "global") { value }',
+    'seoDescription': 'seoDescription: metafield(key: "description", namespace: "global") { value }',
+    'metafield_vendor_sku': 'metafield_vendor_sku: metafield(key: "vendor_sku", namespace: "custom") { value }',
+    'metafield_enable_best_price': 'metafield_enable_best_price: metafield(key: "enable_best_price", namespace: "custom") { value }',
+    'metafield_arrives_before_christmas': 'metafield_arrives_before_christmas: metafield(key: "arrives_before_christmas", namespace: "custom") { value }',
+    'metafield_info_meta_text': 'metafield_info_meta_text: metafield(key: "info_meta_text", namespace: "custom") { value }',
+    'isGiftCard': 'isGiftCard',
+}
+
+# Variant fields that can be requested as 'variants.<field>', and their selection
+VARIANT_FIELD_SELECTIONS = {
+    'id': 'id',
+    'sku': 'sku',
+    'displayName': 'displayName',
+    'price': 'price',
+    'compareAtPrice': 'compareAtPrice',
+    'inventoryQuantity': 'inventoryQuantity',
+    'barcode': 'barcode',
+    'inventoryItem': 'inventoryItem { measurement { weight { unit value } } tracked }',
+}
+
+# Field each PRODUCT_CSV_COLUMNS column is read from; the other columns are constants
+PRODUCT_CSV_FIELD_SOURCES = {
+    'ID': 'id',
+    'Handle': 'handle',
+    'Title': 'title',
+    'Body (HTML)': 'descriptionHtml',
+    'Vendor': 'vendor',
+    'Type': 'productType',
+    'Tags': 'tags',
+    'Status': 'status',
+    'Gift Card': 'isGiftCard',
+    'SEO Title': 'seo',
+    'SEO Description': 'seo',
+    'Vendor SKU': 'metafield_vendor_sku',
+    'enable_best_price (product.metafields.custom.enable_best_price)': 'metafield_enable_best_price',
+    'arrives_before_christmas (product.metafields.custom.arrives_before_christmas)': 'metafield_arrives_before_christmas',
+    'info_meta_text (product.metafields.custom.info_meta_text)': 'metafield_info_meta_text',
+    'Variant SKU': 'variants.sku',
+    'Variant Grams': 'variants.inventoryItem',
+    'Variant Inventory Tracker': 'variants.inventoryItem',
+    'Variant Weight Unit': 'variants.inventoryItem',
+    'Variant Price': 'variants.price',
+    'Variant Compare At Price': 'variants.compareAtPrice',
+    'Variant Barcode': 'variants.barcode',
+    'Available Qty': 'variants.inventoryQuantity',
+}
+
+# Bulk mutation phases run per chunk by run_bulk_pipeline(), in dependency order
+BULK_PIPELINE_PHASES = {
+    'import': ['product', 'variant', 'publish'],
+    'update': ['update'],
+}
+
+# ShopifyApp method that submits the bulk mutation of each phase
+BULK_PHASE_MUTATIONS = {
+    'product': 'create_products',
+    'variant': 'create_variants',
+    'publish': 'publish_products',
+    'update': 'update_products',
+}
+
+# Phases whose mutation creates objects: an input line without a result may
+# still have gone through, so resubmitting it could create a duplicate
+BULK_CREATE_PHASES = {'product', 'variant'}
+
+# Failure message of an input line the bulk operation returned no result for
+BULK_NO_RESULT_MESSAGE = 'No result returned'
+
+# userError messages (lowercased) meaning the product an input line points at is gone
+BULK_PRODUCT_NOT_FOUND_MESSAGES = ('product does not exist', 'product not found', 'publishable does not exist')
+
+# Seconds a bulk operation may appear to predate its journaled submission, for
+# clock skew between this machine and Shopify, and still be adopted on resume
+BULK_RESUME_CLOCK_SKEW = 300
+
+# Typed columns of a Parquet product table; every other column is stored as text
+PRODUCT_PARQUET_DTYPES = {
+    'Variant Grams': 'Float64',
+    'Variant Price': 'Float64',
+    'Variant Compare At Price': 'Float64',
+    'Cost per item': 'Float64',
+    'Image Position': 'Int64',
+    'Available Qty': 'Int64',
+}
+
+# Columns csv_to_jsonl() needs in the product CSV
+PRODUCT_JSONL_COLUMNS = [
+    'Title', 'Body (HTML)', 'Vendor', 'Product Category', 'Type', 'Tags', 'Published',
+    'Option1 Name', 'Option1 Value', 'Option1 Linked To',
+    'Option2 Name', 'Option2 Value', 'Option2 Linked To',
+    'Option3 Name', 'Option3 Value', 'Option3 Linked To',
+    'Variant SKU', 'Variant Grams', 'Variant Inventory Tracker', 'Variant Inventory Policy',
+    'Variant Fulfillment Service', 'Variant Price', 'Variant Compare At Price',
+    'Variant Requires Shipping', 'Variant Taxable', 'Variant Barcode',
+    'Image Src', 'Image Position', 'Image Alt Text', 'Gift Card', 'SEO Title', 'SEO Description',
+    'Variant Image', 'Variant Weight Unit', 'Cost per item', 'Status', 'Available Qty', 'Vendor SKU',
+    'enable_best_price (product.metafields.custom.enable_best_price)',
+    'arrives_before_christmas (product.metafields.custom.arrives_before_christmas)',
+    'info_meta_text (product.metafields.custom.info_meta_text)'
+]
+
+# ==================================== Column Transforms ================================
+# Column-wise versions of the per-cell conversions csv_to_jsonl() applies.
+# Each returns a list aligned with the input Series.
+
+def _truthy(series):
+    # Python truthiness of every cell ('' and 0 are falsy, NaN is truthy)
+    return series.to_numpy().astype(bool)
+
+def _non_empty(series):
+    # cell != '' for text columns; numeric cells never equal ''
+    if series.dtype == object:
+        return series.to_numpy() != ''
+    return np.ones(len(series), dtype=bool)
+
+def _stripped(series):
+    # str(cell).strip()
+    return series.astype(str).str.strip()
+
+def _stripped_or_empty(series):
+    # str(cell).strip() if cell else ''
+    return np.where(_truthy(series), _stripped(series), '').tolist()
+
+def _is_text(series, text):
+    # str(cell).strip().lower() == text
+    return (_stripped(series).str.lower() == text).tolist()
+
+def _convert(series, convert, default):
+    """
+    convert(cell) if cell else default. Text cells are converted once per
+    distinct value; numeric columns are converted as arrays.
+    """
+    values = series.to_numpy()
+    truthy = values.astype(bool)
+    result = np.full(len(values), default, dtype=object)
+    if truthy.any():
+        if series.dtype == object:
+            present = pd.Series(values[truthy])
+            lookup = {value: convert(value) for value in present.unique()}
+            result[truthy] = present.map(lookup).to_numpy()
+        else:
+            result[truthy] = [convert(value) for value in values[truthy].tolist()]
+    return result.tolist()
+
+def _to_float(value):
+    return float(value)
+
+def _to_int(value):
+    return int(value)
+
+def _to_barcode(value):
+    return str(int(float(value))).strip()
+
+def _to_vendor_sku(value):
+    try:
+        return str(int(float(value)))
+    except:
+        return str(value)
+
+def _split_by_group(group_ids, values, group_count):
+    """
+    Splits values of rows sorted by group into one list per group.
+    Groups without any value get an empty list.
+    """
+    result = [[] for _ in range(group_count)]
+    if len(group_ids):
+        cuts = np.flatnonzero(np.diff(group_ids)) + 1
+        values = np.asarray(values, dtype=object)
+        for group_id, part in zip(group_ids[np.r_[0, cuts]].tolist(), np.split(values, cuts)):
+            result[group_id] = part.tolist()
+    return result
+
+# ==================================== Parquet ================================
+# A product table can be stored as Parquet instead of CSV: text columns as
+# strings, the PRODUCT_PARQUET_DTYPES columns as numbers, empty cells as nulls.
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError('Parquet support needs pyarrow (pip install pyarrow)')
+
+def _is_parquet(file_path):
+    return str(file_path).lower().endswith('.parquet')
+
+def _parquet_frame(df):
+    """
+    Returns df with the Parquet product table dtypes. Cells of numeric columns
+    that are empty or do not parse as numbers (or as integers, for Int64
+    columns) become nulls.
+    """
+    columns = {}
+    for col in df.columns:
+        dtype = PRODUCT_PARQUET_DTYPES.get(col)
+        if dtype is None:
+            columns[col] = df[col].astype('string')
+            continue
+        numbers = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        if dtype == 'Int64':
+            numbers = numbers.where(numbers % 1 == 0)
+        columns[col] = numbers.astype(dtype)
+    return pd.DataFrame(columns, index=df.index)
+
+def _canonical_text_frame(df):
+    """
+    Returns the cells of a text frame as they read back from a Parquet product
+    table, as text: the PRODUCT_PARQUET_DTYPES columns are parsed and written
+    out again (so '598.00' and '598' agree) and nulls become ''.
+    """
+    columns = {}
+    for col, values in _parquet_frame(df).items():
+        columns[col] = values.astype('string').fillna('').astype(object)
+    return pd.DataFrame(columns, index=df.index)
+
+def _csv_like_frame(table, text=False):
+    """
+    Converts an Arrow table (or record batch) read from Parquet into what
+    pd.read_csv(keep_default_na=False) returns: nulls become '', text columns
+    are object columns and numeric columns without nulls keep a numpy dtype.
+    With text, every cell is a string, as with pd.read_csv(dtype=str).
+    Nulls are filled on the Arrow side, where it is cheap.
+    """
+    columns = {}
+    for name, column in zip(table.schema.names, table.columns):
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        if text and not pa.types.is_string(column.type):
+            column = pc.cast(column, pa.string())
+        if pa.types.is_string(column.type):
+            columns[name] = pc.fill_null(column, '').to_numpy(zero_copy_only=False)
+        elif column.null_count == 0:
+            columns[name] = column.to_numpy(zero_copy_only=False)
+        else:
+            values = column.to_numpy(zero_copy_only=False)
+            missing = pd.isna(values)
+            values = values.astype(object)
+            values[missing] = ''
+            columns[name] = values
+    return pd.DataFrame(columns, index=pd.RangeIndex(table.num_rows))
+
+# ==================================== JSONL I/O ================================
+# Every JSONL file goes through these helpers: records are encoded with orjson
+# when it is installed (json otherwise) and written through a large buffer.
+# Paths ending in .gz or .zst are compressed / decompressed on the fly.
+
+# Buffer size of JSONL readers and writers
+JSONL_BUFFER_SIZE = 1 << 20
+
+# gzip level of .gz JSONL files; higher levels barely shrink JSONL further
+JSONL_GZIP_LEVEL = 6
+
+def _dumps_jsonl(data):
+    """
+    Encodes one record as a UTF-8 JSONL line, newline included.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return (json.dumps(data, ensure_ascii=False) + '\n').encode('utf-8')
+
+def _loads_jsonl(line):
+    """
+    Decodes one JSONL line (str or bytes). Raises json.JSONDecodeError.
+    """
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+def _open_jsonl(jsonl_file_path, mode='rb'):
+    """
+    Opens a JSONL file in binary mode ('rb', 'wb' or 'ab'), buffered and
+    compressed according to its extension.
+    """
+    path = str(jsonl_file_path).lower()
+    if path.endswith('.gz'):
+        stream = gzip.open(jsonl_file_path, mode, compresslevel=JSONL_GZIP_LEVEL)
+    elif path.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError('.zst JSONL files need zstandard (pip install zstandard)')
+        stream = zstandard.open(jsonl_file_path, mode)
+    else:
+        return open(jsonl_file_path, mode, buffering=JSONL_BUFFER_SIZE)
+    if 'r' in mode:
+        return io.BufferedReader(stream, buffer_size=JSONL_BUFFER_SIZE)
+    return io.BufferedWriter(stream, buffer_size=JSONL_BUFFER_SIZE)
+
+def _write_jsonl_records(datas, jsonl_file_path, mode='wb'):
+    """
+    Writes one JSONL line per record and returns the number of records written.
+    """
+    count = 0
+    with _open_jsonl(jsonl_file_path, mode) as outfile:
+        for data in datas:
+            outfile.write(_dumps_jsonl(data))
+            count += 1
+    return count
+
+def _apply_stages(records, stages):
+    """
+    Chains transform stages over an iterable of records. A stage takes the
+    records of the stage before it and yields records, so each record passes
+    through all stages before the next one is built.
+    """
+    for stage in stages:
+        records = stage(records)
+    return records
+
+# ==================================== JSONL Shards ================================
+def _write_jsonl_shard(rows, mode, jsonl_file_path, product_id_df=None, publication_ids=None, locationId=None,
+                       last_variant_image=None):
+    """
+    Process pool worker of ShopifyApp.product_groups_to_jsonl(): groups a
+    contiguous range of handles and writes their records of the given mode to
+    jsonl_file_path. Returns the number of records written.
+    """
+    app = ShopifyApp()
+    groups = app._group_product_rows(rows)
+    datas = app._mode_records(groups, mode, product_id_df=product_id_df, publication_ids=publication_ids,
+                              locationId=locationId, last_variant_image=last_variant_image)
+    return app._write_jsonl(datas, jsonl_file_path)
+
+@dataclass
+class CostThrottle:
+    """
+    Leaky-bucket model of the Admin GraphQL query cost limit.
+
+    The bucket state is refreshed from extensions.cost.throttleStatus of every
+    response and refills at restoreRate points per second in between. Before a
+    request is sent, its requested cost (the last observed requestedQueryCost of
+    the same query, or default_cost) is reserved from the bucket, waiting just
+    long enough for the bucket to refill when there is not enough room.
+    """
+    maximum_available: float = 1000.0
+    currently_available: float = 1000.0
+    restore_rate: float = 50.0
+    default_cost: float = 50.0
+    updated_at: float = field(default_factory=time.monotonic)
+    pending_cost: float = 0.0
+    query_costs: dict = field(default_factory=dict)
+    _lock: asyncio.Lock = field(default=None, init=False, repr=False)
+
+    def available(self):
+        elapsed = time.monotonic() - self.updated_at
+        return min(self.maximum_available, self.currently_available + elapsed * self.restore_rate)
+
+    def estimate_cost(self, query):
+        return self.query_costs.get(query, self.default_cost)
+
+    def wait_time(self, cost):
+        # A query can never reserve more than the bucket holds
+        cost = min(cost, self.maximum_available)
+        missing = cost - self.available()
+        if missing <= 0:
+            return 0.0
+        return missing / self.restore_rate
+
+    async def acquire(self, query):
+        """
+        Waits until the bucket can cover the estimated cost of the query and
+        reserves it. Returns the reserved cost, to be passed to release().
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        cost = self.estimate_cost(query)
+        async with self._lock:
+            delay = self.wait_time(cost)
+            if delay > 0:
+                print(f"Throttling: waiting {delay:.2f}s for {cost:.0f} query cost points...")
+                await asyncio.sleep(delay)
+            self.currently_available = self.available() - min(cost, self.maximum_available)
+            self.updated_at = time.monotonic()
+            self.pending_cost += cost
+        return cost
+
+    def release(self, query, reserved_cost, cost=None):
+        """
+        Returns a reservation and, when the response carried an
+        extensions.cost block, resynchronises the bucket with the shop.
+        """
+        self.pending_cost = max(0.0, self.pending_cost - reserved_cost)
+        if not cost:
+            return
+
+        if cost.get('requestedQueryCost') is not None:
+            self.query_costs[query] = float(cost['requestedQueryCost'])
+
+        throttle_status = cost.get('throttleStatus')
+        if throttle_status:
+            self.maximum_available = float(throttle_status['maximumAvailable'])
+            self.restore_rate = float(throttle_status['restoreRate'])
+            # Requests still in flight have not been charged in this snapshot yet
+            self.currently_available = float(throttle_status['currentlyAvailable']) - self.pending_cost
+            self.updated_at = time.monotonic()
+
+@dataclass
+class HandleCache:
+    """
+    Persistent handle -> product GID map backed by a local SQLite file, so
+    repeated imports of the same catalog do not have to look IDs up again.
+    """
+    path: str = 'handle_cache.sqlite'
+    _connection: sqlite3.Connection = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    # SQLite limits the number of host parameters in a single statement
+    batch_size = 500
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS product_handles ('
+                'handle TEXT PRIMARY KEY, product_id TEXT NOT NULL, updated_at TEXT NOT NULL)'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS product_handles_id ON product_handles (product_id)')
+        return self._connection
+
+    def get_many(self, handles):
+        """
+        Returns a dict of handle -> product GID for the cached handles.
+        """
+        handles = list(dict.fromkeys(handles))
+        found = {}
+        with self._lock:
+            connection = self._connect()
+            for i in range(0, len(handles), self.batch_size):
+                batch = handles[i:i + self.batch_size]
+                placeholders = ','.join('?' * len(batch))
+                rows = connection.execute(
+                    f'SELECT handle, product_id FROM product_handles WHERE handle IN ({placeholders})', batch
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, product_ids):
+        """
+        Stores a dict of handle -> product GID.
+        """
+        if not product_ids:
+            return
+        updated_at = datetime.utcnow().isoformat()
+        with self._lock:
+            connection = self._connect()
+            connection.executemany(
+                'INSERT OR REPLACE INTO product_handles (handle, product_id, updated_at) VALUES (?, ?, ?)',
+                [(handle, product_id, updated_at) for handle, product_id in product_ids.items()]
+            )
+            connection.commit()
+
+    def delete_handles(self, handles):
+        with self._lock:
+            connection = self._connect()
+            connection.executemany('DELETE FROM product_handles WHERE handle = ?', [(handle,) for handle in handles])
+            connection.commit()
+
+    def delete_ids(self, product_ids):
+        with self._lock:
+            connection = self._connect()
+            connection.executemany('DELETE FROM product_handles WHERE product_id = ?', [(product_id,) for product_id in product_ids])
+            connection.commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+@dataclass
+class ImportJournal:
+    """
+    Crash-safe record of bulk import progress backed by a local SQLite file.
+    Every step (chunk, phase) is written as it moves through prepared ->
+    submitting -> submitted -> completed / failed, so an interrupted import can
+    skip finished work and attach to a bulk operation that is still running.
+    """
+    path: str = 'import_journal.sqlite'
+    _connection: sqlite3.Connection = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS import_steps ('
+                'chunk TEXT NOT NULL, fingerprint TEXT NOT NULL, phase TEXT NOT NULL, status TEXT NOT NULL, '
+                'staged_upload_path TEXT, bulk_operation_id TEXT, updated_at TEXT NOT NULL, '
+                'PRIMARY KEY (chunk, fingerprint, phase))'
+            )
+        return self._connection
+
+    def get(self, chunk, fingerprint, phase):
+        """
+        Returns the journal entry of a step as a dict, or None if it was never started.
+        """
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                'SELECT status, staged_upload_path, bulk_operation_id, updated_at FROM import_steps '
+                'WHERE chunk = ? AND fingerprint = ? AND phase = ?', (chunk, fingerprint, phase)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('status', 'staged_upload_path', 'bulk_operation_id', 'updated_at'), row))
+
+    def has_operation(self, bulk_operation_id):
+        """
+        Returns True if a journaled step already recorded this bulk operation.
+        """
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                'SELECT 1 FROM import_steps WHERE bulk_operation_id = ? LIMIT 1', (bulk_operation_id,)
+            ).fetchone()
+        return row is not None
+
+    def record(self, chunk, fingerprint, phase, status, staged_upload_path=None, bulk_operation_id=None):
+        """
+        Moves a step to a new status. Fields left as None keep their previous value.
+        """
+        # Same format as BulkOperation.createdAt so the two compare as strings
+        updated_at = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                'INSERT INTO import_steps (chunk, fingerprint, phase, status, staged_upload_path, bulk_operation_id, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (chunk, fingerprint, phase) DO UPDATE SET '
+                'status = excluded.status, updated_at = excluded.updated_at, '
+                'staged_upload_path = COALESCE(excluded.staged_upload_path, staged_upload_path), '
+                'bulk_operation_id = COALESCE(excluded.bulk_operation_id, bulk_operation_id)',
+                (chunk, fingerprint, phase, status, staged_upload_path, bulk_operation_id, updated_at)
+            )
+            connection.commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+@dataclass
+class ProductHashStore:
+    """
+    Content hashes of the products last pushed successfully, per handle and
+    import mode, backed by a local SQLite file. Lets a rerun on a mostly
+    unchanged feed skip the products that have not changed since.
+    """
+    path: str = 'product_hashes.sqlite'
+    _connection: sqlite3.Connection = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    # SQLite limits the number of host parameters in a single statement
+    batch_size = 500
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS product_hashes ('
+                'scope TEXT NOT NULL, handle TEXT NOT NULL, content_hash TEXT NOT NULL, updated_at TEXT NOT NULL, '
+                'PRIMARY KEY (scope, handle))'
+            )
+        return self._connection
+
+    def get_many(self, scope, handles):
+        """
+        Returns a dict of handle -> content hash for the stored handles.
+        """
+        handles = list(dict.fromkeys(handles))
+        found = {}
+        with self._lock:
+            connection = self._connect()
+            for i in range(0, len(handles), self.batch_size):
+                batch = handles[i:i + self.batch_size]
+                placeholders = ','.join('?' * len(batch))
+                rows = connection.execute(
+                    f'SELECT handle, content_hash FROM product_hashes WHERE scope = ? AND handle IN ({placeholders})', [scope, *batch]
+                ).fetchall()
+                found.update(rows)
+        return found
+
+    def put_many(self, scope, content_hashes):
+        """
+        Stores a dict of handle -> content hash.
+        """
+        if not content_hashes:
+            return
+        updated_at = datetime.utcnow().isoformat()
+        with self._lock:
+            connection = self._connect()
+            connection.executemany(
+                'INSERT OR REPLACE INTO product_hashes (scope, handle, content_hash, updated_at) VALUES (?, ?, ?, ?)',
+                [(scope, handle, content_hash, updated_at) for handle, content_hash in content_hashes.items()]
+            )
+            connection.commit()
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+@dataclass
+class CatalogStore:
+    """
+    Local mirror of the catalog in a SQLite file: products (with their full
+    node as returned by the product reads), variants, media and metafields,
+    indexed by handle, GID, SKU, barcode and custom.vendor_sku so lookups do not
+    need the API. Filled from any product read while ShopifyApp.catalog is set.
+    """
+    path: str = 'catalog.sqlite'
+    _connection: sqlite3.Connection = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    # SQLite limits the number of host parameters in a single statement
+    batch_size = 500
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(
+                'CREATE TABLE IF NOT EXISTS products ('
+                'id TEXT PRIMARY KEY, handle TEXT NOT NULL UNIQUE, title TEXT, vendor TEXT, product_type TEXT, '
+                'status TEXT, updated_at TEXT, node TEXT NOT NULL);'
+                'CREATE TABLE IF NOT EXISTS variants ('
+                'id TEXT PRIMARY KEY, product_id TEXT NOT NULL, sku TEXT, barcode TEXT, price TEXT, '
+                'compare_at_price TEXT, inventory_quantity INTEGER);'
+                'CREATE INDEX IF NOT EXISTS variants_product ON variants (product_id);'
+                'CREATE INDEX IF NOT EXISTS variants_sku ON variants (sku);'
+                'CREATE INDEX IF NOT EXISTS variants_barcode ON variants (barcode);'
+                'CREATE TABLE IF NOT EXISTS media ('
+                'id TEXT PRIMARY KEY, product_id TEXT NOT NULL, position INTEGER, alt TEXT, url TEXT);'
+                'CREATE INDEX IF NOT EXISTS media_product ON media (product_id);'
+                'CREATE TABLE IF NOT EXISTS metafields ('
+                'product_id TEXT NOT NULL, namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT, '
+                'PRIMARY KEY (product_id, namespace, key));'
+                'CREATE INDEX IF NOT EXISTS metafields_value ON metafields (namespace, key, value);'
+                'CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT);'
+                'CREATE TABLE IF NOT EXISTS sync_scopes ('
+                'scope TEXT NOT NULL, product_id TEXT NOT NULL, PRIMARY KEY (scope, product_id));'
+            )
+        return self._connection
+
+    @staticmethod
+    def _nodes(connection):
+        # Connections come as {nodes: [...]} from paginated reads and {edges: [{node}]} from others
+        if not connection:
+            return []
+        if 'nodes' in connection:
+            return connection['nodes']
+        return [edge['node'] for edge in connection.get('edges', [])]
+
+    @staticmethod
+    def _metafields(product):
+        """
+        Returns (namespace, key, value) for the metafields selected on a product node.
+        """
+        aliases = {'seoTitle': ('global', 'title'), 'seoDescription': ('global', 'description')}
+        metafields = []
+        for name, metafield in product.items():
+            if not isinstance(metafield, dict) or 'value' not in metafield:
+                continue
+            if name in aliases:
+                metafields.append((*aliases[name], metafield['value']))
+            elif name.startswith('metafield_'):
+                metafields.append(('custom', name[len('metafield_'):], metafield['value']))
+        for metafield in CatalogStore._nodes(product.get('metafields')):
+            metafields.append((metafield['namespace'], metafield['key'], metafield['value']))
+        return metafields
+
+    def _delete(self, connection, product_ids):
+        for table, column in (('variants', 'product_id'), ('media', 'product_id'), ('metafields', 'product_id'), ('products', 'id')):
+            connection.executemany(f'DELETE FROM {table} WHERE {column} = ?', [(product_id,) for product_id in product_ids])
+
+    def put_products(self, products):
+        """
+        Inserts or replaces product nodes together with their variants, media and metafields.
+        """
+        products = [product for product in products if product.get('id') and product.get('handle')]
+        # The last node of an ID (or handle) in the batch wins
+        products = list({product['handle']: product for product in {product['id']: product for product in products}.values()}.values())
+        if not products:
+            return
+        with self._lock, self._connect() as connection:
+            # The connection context commits the whole batch, or rolls it back on an error
+            ids = [product['id'] for product in products]
+            # A handle that moved to a new product (deleted and recreated) drops the old one
+            stale = []
+            for product in products:
+                stale += [row[0] for row in connection.execute(
+                    'SELECT id FROM products WHERE handle = ? AND id != ?', (product['handle'], product['id'])
+                )]
+            self._delete(connection, stale + ids)
+
+            connection.executemany(
+                'INSERT OR REPLACE INTO products (id, handle, title, vendor, product_type, status, updated_at, node) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (p['id'], p['handle'], p.get('title'), p.get('vendor'), p.get('productType'), p.get('status'), p.get('updatedAt'), json.dumps(p, ensure_ascii=False))
+                    for p in products
+                ]
+            )
+            connection.executemany(
+                'INSERT OR REPLACE INTO variants (id, product_id, sku, barcode, price, compare_at_price, inventory_quantity) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (v['id'], p['id'], v.get('sku') or (v.get('inventoryItem') or {}).get('sku'), v.get('barcode'), v.get('price'), v.get('compareAtPrice'), v.get('inventoryQuantity'))
+                    for p in products for v in self._nodes(p.get('variants')) if v.get('id')
+                ]
+            )
+            connection.executemany(
+                'INSERT OR REPLACE INTO media (id, product_id, position, alt, url) VALUES (?, ?, ?, ?, ?)',
+                [
+                    (m['id'], p['id'], position, m.get('alt'), (((m.get('preview') or {}).get('image')) or {}).get('url'))
+                    for p in products for position, m in enumerate(self._nodes(p.get('media')), start=1) if m.get('id')
+                ]
+            )
+            connection.executemany(
+                'INSERT OR REPLACE INTO metafields (product_id, namespace, key, value) VALUES (?, ?, ?, ?)',
+                [(p['id'], *metafield) for p in products for metafield in self._metafields(p)]
+            )
+
+    def get_state(self, key):
+        with self._lock:
+            row = self._connect().execute('SELECT value FROM sync_state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key, value):
+        with self._lock:
+            connection = self._connect()
+            connection.execute('INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)', (key, value))
+            connection.commit()
+
+    def product_ids(self):
+        with self._lock:
+            return {row[0] for row in self._connect().execute('SELECT id FROM products')}
+
+    def delete_products(self, product_ids):
+        with self._lock:
+            connection = self._connect()
+            self._delete(connection, product_ids)
+            connection.executemany('DELETE FROM sync_scopes WHERE product_id = ?', [(product_id,) for product_id in product_ids])
+            connection.commit()
+
+    def add_scope_ids(self, scope, product_ids):
+        """
+        Records product IDs as listed by a sync with the given filter set (scope).
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.executemany('INSERT OR IGNORE INTO sync_scopes (scope, product_id) VALUES (?, ?)', [(scope, product_id) for product_id in product_ids])
+            connection.commit()
+
+    def scope_ids(self, scope):
+        with self._lock:
+            return {row[0] for row in self._connect().execute('SELECT product_id FROM sync_scopes WHERE scope = ?', (scope,))}
+
+    def remove_scope_ids(self, scope, product_ids):
+        """
+        Drops product IDs from a scope and returns those no scope lists anymore.
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.executemany('DELETE FROM sync_scopes WHERE scope = ? AND product_id = ?', [(scope, product_id) for product_id in product_ids])
+            connection.commit()
+            scoped = {row[0] for row in connection.execute('SELECT DISTINCT product_id FROM sync_scopes')}
+        return [product_id for product_id in product_ids if product_id not in scoped]
+
+    def delete_handles(self, handles):
+        with self._lock:
+            connection = self._connect()
+            product_ids = []
+            for handle in handles:
+                product_ids += [row[0] for row in connection.execute('SELECT id FROM products WHERE handle = ?', (handle,))]
+            self._delete(connection, product_ids)
+            connection.commit()
+
+    def _select(self, sql, values):
+        """
+        Runs sql, whose {} takes an IN (...) list, for values in batches.
+        """
+        values = list(dict.fromkeys(values))
+        rows = []
+        with self._lock:
+            connection = self._connect()
+            for i in range(0, len(values), self.batch_size):
+                batch = values[i:i + self.batch_size]
+                rows += connection.execute(sql.format(','.join('?' * len(batch))), batch).fetchall()
+        return rows
+
+    def products_by_handle(self, handles):
+        """
+        Returns a dict of handle -> product node for the stored handles.
+        """
+        return {handle: json.loads(node) for handle, node in self._select('SELECT handle, node FROM products WHERE handle IN ({})', handles)}
+
+    def products_by_id(self, product_ids):
+        """
+        Returns a dict of product GID -> product node for the stored products.
+        """
+        return {product_id: json.loads(node) for product_id, node in self._select('SELECT id, node FROM products WHERE id IN ({})', product_ids)}
+
+    def products_by_vendor_sku(self, vendor_skus):
+        """
+        Returns a dict of custom.vendor_sku value -> product node.
+        """
+        rows = self._select(
+            "SELECT m.value, p.node FROM metafields m JOIN products p ON p.id = m.product_id "
+            "WHERE m.namespace = 'custom' AND m.key = 'vendor_sku' AND m.value IN ({})", vendor_skus
+        )
+        return {vendor_sku: json.loads(node) for vendor_sku, node in rows}
+
+    def _variants_by(self, column, values):
+        # Oldest first, so the most recently updated product wins for duplicate values
+        rows = self._select(
+            f'SELECT v.{column}, v.id, v.product_id, p.handle, v.sku, v.barcode, v.price, v.compare_at_price, v.inventory_quantity '
+            f'FROM variants v JOIN products p ON p.id = v.product_id WHERE v.{column} IN ({{}}) ORDER BY p.updated_at', values
+        )
+        keys = ('id', 'product_id', 'handle', 'sku', 'barcode', 'price', 'compareAtPrice', 'inventoryQuantity')
+        return {row[0]: dict(zip(keys, row[1:])) for row in rows}
+
+    def variants_by_sku(self, skus):
+        """
+        Returns a dict of SKU -> variant (id, product_id, handle, sku, barcode,
+        price, compareAtPrice, inventoryQuantity).
+        """
+        return self._variants_by('sku', skus)
+
+    def variants_by_barcode(self, barcodes):
+        """
+        Returns a dict of barcode -> variant, like variants_by_sku().
+        """
+        return self._variants_by('barcode', barcodes)
+
+    def iter_products(self, batch_size=1000):
+        """
+        Yields every stored product node, ordered by handle.
+        """
+        last_handle = ''
+        while True:
+            with self._lock:
+                rows = self._connect().execute(
+                    'SELECT handle, node FROM products WHERE handle > ? ORDER BY handle LIMIT ?', (last_handle, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for handle, node in rows:
+                yield json.loads(node)
+            last_handle = rows[-1][0]
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+class BulkOperationError(Exception):
+    """
+    Raised when a bulk operation cannot be started, ends in a FAILED, CANCELED
+    or EXPIRED state, or does not finish in time.
+    """
+    def __init__(self, message, operation=None):
+        super().__init__(message)
+        self.operation = operation
+
+class BulkSubmissionUnresolvedError(BulkOperationError):
+    """
+    Raised on resume when a create step was interrupted while being submitted
+    and no bulk operation can be matched to it. The step may or may not have
+    run; check the Shopify admin before recording it as completed or failed in
+    the import journal.
+    """
+
+class PaginationError(Exception):
+    """
+    Raised by a strict paginate() when a page cannot be fetched, so a listing
+    that was cut short is not mistaken for a complete one.
+    """
+
+@dataclass
+class BulkOperationWebhookReceiver:
+    """
+    Local HTTP receiver for BULK_OPERATIONS_FINISH webhooks. Expose it to
+    Shopify (e.g. through a tunnel), subscribe its public URL with
+    ShopifyApp.webhook_subscription() and assign it to ShopifyApp.webhook_receiver
+    so wait_for_bulk_operation() returns as soon as the webhook arrives.
+
+    It listens on localhost by default, for a tunnel to forward to. Without a
+    secret any POST counts as a delivery, so set one whenever the port is
+    reachable from elsewhere.
+    """
+    host: str = '127.0.0.1'
+    port: int = 8080
+    # App client secret used to verify X-Shopify-Hmac-Sha256, if set
+    secret: str = None
+    _server: ThreadingHTTPServer = field(default=None, init=False, repr=False)
+    _thread: threading.Thread = field(default=None, init=False, repr=False)
+    _finished: dict = field(default_factory=dict, init=False, repr=False)
+    _condition: threading.Condition = field(default_factory=threading.Condition, init=False, repr=False)
+
+    def start(self):
+        if not self.secret:
+            print('Warning: Webhook receiver has no secret; deliveries are NOT verified and any POST '
+                  'to this port will be taken as a finished bulk operation. Set secret to the app client secret.')
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self.send_response(receiver.receive(body, self.headers.get('X-Shopify-Hmac-Sha256')))
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"Listening for bulk operation webhooks on {self.host}:{self._server.server_port}...")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+    def receive(self, body, signature=None):
+        """
+        Records a webhook delivery and returns the HTTP status to answer with.
+        """
+        if self.secret:
+            digest = base64.b64encode(hmac.new(self.secret.encode('utf-8'), body, hashlib.sha256).digest()).decode()
+            if not signature or not hmac.compare_digest(digest, signature):
+                print('Warning: Rejected webhook with invalid signature')
+                return 401
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError:
+            return 400
+
+        operation_id = payload.get('admin_graphql_api_id')
+        if operation_id:
+            with self._condition:
+                self._finished[operation_id] = payload
+                self._condition.notify_all()
+        return 200
+
+    def wait(self, operation_id, timeout=None):
+        """
+        Blocks until the webhook for operation_id has been received or the
+        timeout expires. Returns the webhook payload, or None on timeout. A
+        payload is handed out once.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: operation_id in self._finished, timeout=timeout)
+            return self._finished.pop(operation_id, None)
+
 @dataclass
 class ShopifyApp:
     store_name: str = None
     access_token: str = None
     client: Client = None
     api_version: str = '2025-07'
+    async_client: AsyncClient = None
+    max_concurrency: int = 10
+    throttle: CostThrottle = field(default_factory=CostThrottle)
+    handle_cache: HandleCache = None
+    webhook_receiver: BulkOperationWebhookReceiver = None
+    import_journal: ImportJournal = None
+    product_hashes: ProductHashStore = None
+    # Set (or call sync_catalog()) to mirror product reads locally and answer lookups from it
+    catalog: CatalogStore = None
+    _loop: asyncio.AbstractEventLoop = field(default=None, init=False, repr=False)
+    _loop_thread: threading.Thread = field(default=None, init=False, repr=False)
+    _semaphore: asyncio.Semaphore = field(default=None, init=False, repr=False)
 
     # Support
 
+    # ==================================== Event Loop ================================
+    def _ensure_loop(self):
+        """
+        Starts the background event loop that owns the AsyncClient.
+        Sync wrappers submit their coroutines to this loop so that the same
+        connection pool and concurrency limit are shared by every call.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+            self._loop_thread.start()
+        return self._loop
+
+    def _run(self, coro):
+        """
+        Runs a coroutine on the background event loop and blocks until it returns.
+        """
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def _get_semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def gather_bounded(self, coros):
+        """
+        Runs the given coroutines concurrently. The number of requests in flight
+        is bounded by max_concurrency through send_request_async.
+        """
+        return await asyncio.gather(*coros)
+
     # ==================================== Send Request ================================
-    def send_request(self, query, variables=None):
-        if not self.client:
+    async def send_request_async(self, query, variables=None, return_errors=False):
+        """
+        Sends a GraphQL request, retrying HTTP errors and throttled responses.
+        Returns the response data, or None on failure. A response carrying GraphQL
+        errors counts as a failure unless return_errors is set, in which case it
+        is returned as is for the caller to inspect.
+        """
+        if not self.async_client:
             print('Error: Please create a session before executing the function.')
             return None
 
@@ -34,20 +1105,39 @@ class ShopifyApp:
 
         max_retries = 3
         retries = 0
+        max_throttle_retries = 10
+        throttle_retries = 0
 
         while retries < max_retries:
             try:
-                response = self.client.post(url, json=payload)
+                reserved_cost = await self.throttle.acquire(query)
+                cost = None
+                try:
+                    async with self._get_semaphore():
+                        response = await self.async_client.post(url, json=payload)
+
+                    # A 2xx status code indicates success
+                    if 200 <= response.status_code < 400:
+                        data = response.json()
+                        cost = data.get('extensions', {}).get('cost')
+                finally:
+                    self.throttle.release(query, reserved_cost, cost)
 
-                # A 2xx status code indicates success
                 if 200 <= response.status_code < 400:
+                    # Throttled requests are retried once the bucket has refilled
+                    if 'errors' in data and self._is_throttled(data['errors']) and throttle_retries < max_throttle_retries:
+                        throttle_retries += 1
+                        delay = self.throttle.wait_time(self.throttle.estimate_cost(query))
+                        print(f"Throttled by Shopify. Retrying in {delay:.2f}s...")
+                        await asyncio.sleep(delay)
+                        continue
+
                     print(f"Request successful after {retries + 1} attempt(s).")
-                    data = response.json()
                     
                     # Check for GraphQL errors within the response body
                     if 'errors' in data:
                         print(f"GraphQL Errors: {data['errors']}")
-                        return None
+                        return data if return_errors else None
                     
                     print(data)
 
@@ -58,13 +1148,14 @@ class ShopifyApp:
                     print(f"HTTP Error {response.status_code}: {response.reason_phrase}")
                     print(f"Attempt {retries + 1}/{max_retries} failed. Retrying...")
                     retries += 1
-                    time.sleep(2 ** retries) # Exponential backoff delay
+                    retry_after = response.headers.get('Retry-After')
+                    await asyncio.sleep(float(retry_after) if retry_after else 2 ** retries) # Exponential backoff delay
                     
             except httpx.HTTPError as e:
                 print(f"Request failed: {e}")
                 retries += 1
                 print(f"Attempt {retries}/{max_retries} failed. Retrying...")
-                time.sleep(2 ** retries) # Exponential backoff delay
+                await asyncio.sleep(2 ** retries) # Exponential backoff delay
                 
             except json.JSONDecodeError:
                 print("Failed to decode JSON from response.")
@@ -74,6 +1165,188 @@ class ShopifyApp:
         print(f"All {max_retries} attempts failed. Giving up.")
         return None
 
+    @staticmethod
+    def _is_throttled(errors):
+        if not isinstance(errors, list):
+            return False
+        return any(isinstance(error, dict) and error.get('extensions', {}).get('code') == 'THROTTLED' for error in errors)
+
+    @staticmethod
+    def _max_cost_exceeded(errors):
+        """
+        Returns the extensions of a MAX_COST_EXCEEDED error (with the requested
+        cost and the limit), or None if the query was rejected for another reason.
+        """
+        if not isinstance(errors, list):
+            return None
+        for error in errors:
+            extensions = error.get('extensions', {}) if isinstance(error, dict) else {}
+            if extensions.get('code') == 'MAX_COST_EXCEEDED':
+                return extensions
+        return None
+
+    def send_request(self, query, variables=None):
+        if not self.async_client:
+            print('Error: Please create a session before executing the function.')
+            return None
+
+        return self._run(self.send_request_async(query=query, variables=variables))
+
+    # ==================================== Paginate ================================
+    @staticmethod
+    def _get_connection(response, connection_path):
+        if isinstance(connection_path, str):
+            connection_path = connection_path.split('.')
+        connection = response['data']
+        for key in connection_path:
+            connection = connection[key]
+        return connection
+
+    @staticmethod
+    def _connection_nodes(connection):
+        if 'nodes' in connection:
+            return connection['nodes']
+        return [edge['node'] for edge in connection.get('edges', [])]
+
+    def _next_page_variables(self, connection, variables, response=None, max_first=None):
+        page_info = connection.get('pageInfo', {})
+        if not page_info.get('hasNextPage', False):
+            return None
+        next_variables = dict(variables)
+        next_variables['after'] = page_info.get('endCursor')
+        if max_first is not None:
+            next_variables['first'] = self._adapt_page_size(response, variables['first'], max_first)
+        return next_variables
+
+    def _adapt_page_size(self, response, first, max_first):
+        """
+        Scales the page size so the requested cost of the next page lands near the
+        target: the single-query limit, or half the bucket so a prefetched page
+        and the current one fit together. Requested cost grows linearly with
+        first, so the observed cost per item predicts the next page.
+        """
+        cost = ((response or {}).get('extensions') or {}).get('cost') or {}
+        requested = cost.get('requestedQueryCost')
+        if not requested or not first:
+            return first
+        target = min(MAX_QUERY_COST, self.throttle.maximum_available / 2)
+        next_first = int(max(1, min(max_first, target * first / requested)))
+        if next_first != first:
+            print(f'Page size {first} -> {next_first} (requested cost {requested}, target {target:.0f})')
+        return next_first
+
+    async def _request_page_async(self, query, variables):
+        """
+        Requests one page of a paginated connection. When Shopify rejects the
+        page as MAX_COST_EXCEEDED, 'first' is scaled down to fit the single-query
+        limit (then 'variantsFirst', once a page holds a single item) and the page
+        is requested again.
+
+        Returns:
+            tuple: (response or None, the variables the response was requested with)
+        """
+        while True:
+            response = await self.send_request_async(query=query, variables=variables, return_errors=True)
+            if not response or 'errors' not in response:
+                return response, variables
+            exceeded = self._max_cost_exceeded(response['errors'])
+            name = next((name for name in ('first', 'variantsFirst') if (variables.get(name) or 1) > 1), None)
+            if exceeded is None or name is None:
+                return None, variables
+            # Requested cost grows about linearly with the page size
+            ratio = 0.5
+            if exceeded.get('cost'):
+                ratio = float(exceeded.get('maxCost') or MAX_QUERY_COST) / float(exceeded['cost'])
+            size = max(1, min(variables[name] - 1, int(variables[name] * ratio)))
+            print(f"Query cost {exceeded.get('cost')} exceeds the limit: {name} {variables[name]} -> {size}")
+            variables = {**variables, name: size}
+
+    async def paginate_async(self, query, connection_path, variables=None, max_first=None, strict=False):
+        """
+        Async version of paginate().
+        """
+        variables = dict(variables or {})
+        next_page = asyncio.ensure_future(self._request_page_async(query=query, variables=variables))
+        page_count = 0
+        node_count = 0
+        try:
+            while next_page is not None:
+                response, variables = await next_page
+                next_page = None
+                page_count += 1
+                try:
+                    connection = self._get_connection(response, connection_path)
+                except (KeyError, TypeError):
+                    if strict:
+                        raise PaginationError(f'Page {page_count} of {connection_path} could not be fetched')
+                    print("Error: No valid response received")
+                    return
+
+                nodes = self._connection_nodes(connection)
+                node_count += len(nodes)
+                print(f"Page {page_count}: Fetched {len(nodes)} nodes (Total: {node_count})")
+
+                variables = self._next_page_variables(connection, variables, response=response, max_first=max_first)
+                if variables is not None:
+                    next_page = asyncio.ensure_future(self._request_page_async(query=query, variables=variables))
+
+                for node in nodes:
+                    yield node
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    def paginate(self, query, connection_path, variables=None, max_first=None, strict=False):
+        """
+        Lazily yields the nodes of a paginated connection, page by page.
+        The next page is requested in the background while the current one is
+        being consumed, so network time overlaps with processing.
+
+        Args:
+            query (str): GraphQL query accepting an $after cursor variable.
+            connection_path (str or list): Path of the connection below 'data',
+                e.g. 'products' or 'locations.nodes'.
+            variables (dict): Query variables, without 'after'.
+            max_first (int, optional): Adapt the 'first' variable to the observed query
+                cost after every page, up to this page size. A page rejected as
+                MAX_COST_EXCEEDED is requested again with a smaller page size.
+            strict (bool): Raise PaginationError when a page cannot be fetched,
+                instead of ending the listing early.
+
+        Yields:
+            dict: One node of the connection at a time.
+        """
+        loop = self._ensure_loop()
+        variables = dict(variables or {})
+        next_page = asyncio.run_coroutine_threadsafe(self._request_page_async(query=query, variables=variables), loop)
+        page_count = 0
+        node_count = 0
+        try:
+            while next_page is not None:
+                response, variables = next_page.result()
+                next_page = None
+                page_count += 1
+                try:
+                    connection = self._get_connection(response, connection_path)
+                except (KeyError, TypeError):
+                    if strict:
+                        raise PaginationError(f'Page {page_count} of {connection_path} could not be fetched')
+                    print("Error: No valid response received")
+                    return
+
+                nodes = self._connection_nodes(connection)
+                node_count += len(nodes)
+                print(f"Page {page_count}: Fetched {len(nodes)} nodes (Total: {node_count})")
+
+                variables = self._next_page_variables(connection, variables, response=response, max_first=max_first)
+                if variables is not None:
+                    next_page = asyncio.run_coroutine_threadsafe(self._request_page_async(query=query, variables=variables), loop)
+
+                yield from nodes
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
     # ==================================== Clean Tags ================================
     def clean_and_collect_tags(self, series):
         """
@@ -89,63 +1362,244 @@ class ShopifyApp:
         return cleaned_parts
     
     # ==================================== Chunk Data ================================
-    def chunk_shopify_csv_by_product(self, input_csv_path, output_directory="shopify_product_chunks_by_handle", products_per_chunk=200):
+    def chunk_shopify_csv_by_product(self, input_csv_path, output_directory="shopify_product_chunks_by_handle", products_per_chunk=200,
+                                     max_bytes=None, max_variants=None, rows_per_read=10000, columns=None):
         """
-        Reads a Shopify product CSV, chunks it into smaller files ensuring
+        Streams a Shopify product CSV and chunks it into smaller files ensuring
         that each file contains complete products (all variants of a handle).
+        The CSV is read rows_per_read rows at a time and cut only at handle
+        boundaries in a single pass, so memory use does not depend on the file size.
+        Cell values are copied verbatim. A Parquet input (.parquet) is chunked
+        into Parquet files.
 
         Args:
             input_csv_path (str): Path to the input CSV file.
             output_directory (str): Directory to save the chunked CSV files.
             products_per_chunk (int): Maximum number of unique products (Handles) per chunk file.
+            max_bytes (int, optional): Target maximum size of a chunk file in bytes
+                (estimated from cell lengths, quoting excluded).
+            max_variants (int, optional): Maximum number of variants (rows with a Variant SKU) per chunk file.
+            rows_per_read (int): Number of CSV rows read at a time.
+            columns (list, optional): Only copy these columns (Handle is always kept).
+
+        Returns:
+            list: Paths of the chunk files written.
         """
 
         if not os.path.exists(output_directory):
             os.makedirs(output_directory)
 
-        print(f"Reading entire CSV file: {input_csv_path}...")
-        df = pd.read_csv(input_csv_path)
-        print(f"Total rows read: {len(df)}")
+        parquet = _is_parquet(input_csv_path)
+        print(f"Streaming {'Parquet' if parquet else 'CSV'} file: {input_csv_path}...")
+        if columns is not None:
+            columns = ['Handle', *[col for col in columns if col != 'Handle']]
+        reader = self._iter_product_table(input_csv_path, rows_per_read=rows_per_read, columns=columns)
 
-        # Get unique handles in order of appearance
-        unique_handles = df['Handle'].unique()
-        print(f"Total unique products (handles): {len(unique_handles)}")
-
-        file_number = 1
-        current_product_count = 0
-        start_index = 0
         head, tail = os.path.split(input_csv_path)
         filename_split = tail
+        extension = 'parquet' if parquet else 'csv'
+        writer = None
+
+        def append_rows(rows):
+            nonlocal writer
+            if parquet:
+                if len(rows):
+                    writer = self._append_parquet(rows, output_files[-1], writer)
+            else:
+                self._append_csv(rows, output_files[-1])
 
-        for i, handle in enumerate(unique_handles):
-            rows_for_handle = df[df['Handle'] == handle]
+        output_files = []
+        file_number = 0
+        current_product_count = 0
+        current_bytes = 0
+        current_variants = 0
+        current_rows = 0
+        total_rows = 0
+        total_products = 0
+        seen_handles = set()
+
+        for rows, starts, ends in self._iter_handle_blocks(reader):
+            total_rows += len(rows)
+            handles = rows['Handle'].to_numpy()
+            # Estimated bytes per row: cell lengths plus separators and line break
+            row_bytes = np.zeros(len(rows), dtype=np.int64)
+            for col in rows.columns:
+                row_bytes += rows[col].str.len().to_numpy()
+            row_bytes += len(rows.columns)
+            handle_bytes = np.add.reduceat(row_bytes, starts).tolist()
+            if 'Variant SKU' in rows.columns:
+                handle_variants = np.add.reduceat((rows['Variant SKU'] != '').to_numpy().astype(np.int64), starts).tolist()
+            else:
+                handle_variants = (ends - starts).tolist()
+
+            piece_start = 0
+            for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+                handle = handles[start]
+                if handle in seen_handles:
+                    print(f"Warning: Handle '{handle}' is not contiguous in the CSV; its rows will be split across chunks")
+                seen_handles.add(handle)
+
+                limit_reached = (
+                    current_product_count >= products_per_chunk
+                    or (max_bytes is not None and current_bytes + handle_bytes[i] > max_bytes)
+                    or (max_variants is not None and current_variants + handle_variants[i] > max_variants)
+                )
+                if current_product_count > 0 and limit_reached:
+                    # Close the current chunk right before this handle
+                    append_rows(rows.iloc[piece_start:start])
+                    print(f"Saved {current_rows + start - piece_start} rows ({current_product_count} products) to {output_files[-1]}")
+                    piece_start = start
+                    current_product_count = 0
+                    current_bytes = 0
+                    current_variants = 0
+                    current_rows = 0
+
+                if current_product_count == 0:
+                    file_number += 1
+                    output_filename = os.path.join(output_directory, f"{filename_split.split('.')[0]}_{file_number:03d}.{extension}")
+                    if parquet:
+                        if writer is not None:
+                            writer.close()
+                        writer = self._append_parquet(rows.iloc[0:0], output_filename)
+                    else:
+                        rows.iloc[0:0].to_csv(output_filename, index=False)
+                    output_files.append(output_filename)
+
+                current_product_count += 1
+                current_bytes += handle_bytes[i]
+                current_variants += handle_variants[i]
+                total_products += 1
+
+            # Everything not yet written belongs to the open chunk
+            append_rows(rows.iloc[piece_start:])
+            current_rows += len(rows) - piece_start
+
+        if writer is not None:
+            writer.close()
 
-            if current_product_count >= products_per_chunk and i > 0:
-                # Extract the rows for the current chunk
-                chunk_df = df.iloc[start_index : rows_for_handle.index[0]]
+        if current_product_count > 0:
+            print(f"Saved {current_rows} rows ({current_product_count} products) to {output_files[-1]}")
 
-                # Define the output path and save
-                # output_filename = os.path.join(output_directory, f"{repr(input_csv_path).split('\\')[-1].split('.')[0]}_{file_number:03d}.csv")
-                output_filename = os.path.join(output_directory, f"{filename_split.split('.')[0]}_{file_number:03d}.csv")
-                chunk_df.to_csv(output_filename, index=False)
-                print(f"Saved {len(chunk_df)} rows ({current_product_count} products) to {output_filename}")
+        print(f"Total rows read: {total_rows}")
+        print(f"Total unique products (handles): {total_products}")
+        print(f"\nFinished chunking. Total {file_number} files created in '{output_directory}'.")
+        return output_files
 
-                # Reset for the next chunk
-                file_number += 1
-                current_product_count = 0
-                start_index = rows_for_handle.index[0] # New start is where this handle begins
+    def _iter_handle_blocks(self, reader):
+        """
+        Yields (rows, starts, ends) for each block of CSV rows read from reader,
+        where starts/ends are the row ranges of the handles in the block. The
+        last handle of a block is carried over to the next block, so every
+        yielded handle is complete.
+        """
+        carry = []
+        for chunk in reader:
+            if len(chunk) == 0:
+                continue
+            # A block that only continues the carried handle is just queued
+            if carry and (chunk['Handle'].to_numpy() == carry[0]['Handle'].iat[0]).all():
+                carry.append(chunk)
+                continue
+            rows = pd.concat(carry + [chunk], ignore_index=True) if carry else chunk.reset_index(drop=True)
+            starts, ends = self._handle_ranges(rows)
+            carry = [rows.iloc[starts[-1]:]]
+            if len(starts) > 1:
+                yield rows.iloc[:starts[-1]], starts[:-1], ends[:-1]
+
+        if carry:
+            rows = pd.concat(carry, ignore_index=True)
+            starts, ends = self._handle_ranges(rows)
+            yield rows, starts, ends
+
+    @staticmethod
+    def _handle_ranges(rows):
+        handles = rows['Handle'].to_numpy()
+        changes = np.ones(len(rows), dtype=bool)
+        changes[1:] = handles[1:] != handles[:-1]
+        starts = np.flatnonzero(changes)
+        ends = np.append(starts[1:], len(rows)).astype(int)
+        return starts, ends
+
+    @staticmethod
+    def _append_csv(rows, csv_file_path):
+        if len(rows):
+            rows.to_csv(csv_file_path, mode='a', header=False, index=False)
+
+    @staticmethod
+    def _append_parquet(rows, parquet_file_path, writer=None):
+        """
+        Appends rows to a Parquet file with the product table dtypes, opening the
+        writer (and creating the file) when none is given. Returns the writer,
+        which the caller closes once the file is complete.
+        """
+        _require_pyarrow()
+        table = pa.Table.from_pandas(_parquet_frame(rows), schema=writer.schema if writer else None, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(parquet_file_path, table.schema, compression='zstd')
+        writer.write_table(table)
+        return writer
+
+    def _read_product_table(self, file_path, columns=None, text=False):
+        """
+        Reads a product table from a CSV or a Parquet (.parquet) file as
+        pd.read_csv(keep_default_na=False) would, with every cell as a string if
+        text is set. Otherwise only the PRODUCT_PARQUET_DTYPES columns of a CSV
+        are typed by inference and every other column is read as text, as it is
+        stored in Parquet, so an all-numeric text column such as an option value
+        reads the same from both formats. With columns, only those of them that
+        exist are read.
+        """
+        if _is_parquet(file_path):
+            _require_pyarrow()
+            if columns is not None:
+                available = set(pq.read_schema(file_path).names)
+                columns = [col for col in columns if col in available]
+            return _csv_like_frame(pq.read_table(file_path, columns=columns), text=text)
+
+        usecols = None if columns is None else set(columns).__contains__
+        if text:
+            dtype = str
+        else:
+            header = pd.read_csv(file_path, nrows=0).columns
+            dtype = {col: str for col in header if col not in PRODUCT_PARQUET_DTYPES}
+        return pd.read_csv(file_path, dtype=dtype, keep_default_na=False, usecols=usecols)
 
-            current_product_count += 1
+    def _iter_product_table(self, file_path, rows_per_read=10000, columns=None, text=True, dtype=None):
+        """
+        Streams a CSV or Parquet product table rows_per_read rows at a time, with
+        every cell as a string. Without text, cells are read as _read_product_table()
+        does, except that CSV columns take the types given in dtype (pandas would
+        infer them per block otherwise).
+        """
+        if _is_parquet(file_path):
+            _require_pyarrow()
+            parquet_file = pq.ParquetFile(file_path)
+            if columns is not None:
+                columns = [col for col in columns if col in set(parquet_file.schema_arrow.names)]
+            for batch in parquet_file.iter_batches(batch_size=rows_per_read, columns=columns):
+                yield _csv_like_frame(batch, text=text)
+            return
 
-        # Save the last remaining chunk
-        if current_product_count > 0:
-            chunk_df = df.iloc[start_index:]
-            # output_filename = os.path.join(output_directory, f"{repr(input_csv_path).split('\\')[-1].split('.')[0]}_{file_number:03d}.csv")
-            output_filename = os.path.join(output_directory, f"{filename_split.split('.')[0]}_{file_number:03d}.csv")
-            chunk_df.to_csv(output_filename, index=False)
-            print(f"Saved {len(chunk_df)} rows ({current_product_count} products) to {output_filename}")
+        usecols = None if columns is None else set(columns).__contains__
+        yield from pd.read_csv(file_path, dtype=str if text else dtype, keep_default_na=False, chunksize=rows_per_read, usecols=usecols)
 
-        print(f"\nFinished chunking. Total {file_number} files created in '{output_directory}'.")
+    def _csv_column_dtypes(self, csv_file_path, columns=None, rows_per_read=10000):
+        """
+        Streams a CSV once and returns the type pandas infers for every column
+        over the whole file: a column keeps the type inferred in every block,
+        mixed int and float blocks make it float and any other mix makes it
+        text. Text columns, and every column outside PRODUCT_PARQUET_DTYPES
+        (see _read_product_table()), are returned as str.
+        """
+        usecols = None if columns is None else set(columns).__contains__
+        dtypes = {}
+        for chunk in pd.read_csv(csv_file_path, keep_default_na=False, chunksize=rows_per_read, usecols=usecols):
+            for col, dtype in chunk.dtypes.items():
+                previous = dtypes.setdefault(col, dtype)
+                if previous != dtype:
+                    numeric = previous.kind in 'iuf' and dtype.kind in 'iuf'
+                    dtypes[col] = np.dtype('float64') if numeric else np.dtype(object)
+        return {col: str if dtype == object or col not in PRODUCT_PARQUET_DTYPES else dtype for col, dtype in dtypes.items()}
 
     def chunk_list(self, input_list, chunk_size=249):
         """
@@ -168,7 +1622,8 @@ class ShopifyApp:
         return result_list
 
     # ==================================== CSV to JSONL ================================
-    def csv_to_jsonl(self, csv_file_path, jsonl_file_path, mode, locationId=None):
+    def csv_to_jsonl(self, csv_file_path, jsonl_file_path, mode, locationId=None, skip_handles=None, workers=None, stream=False,
+                     rows_per_read=10000):
         """
         Converts a CSV file containing Shopify product data into a JSONL format
         suitable for Shopify's bulk import using the GraphQL Admin API.
@@ -176,12 +1631,19 @@ class ShopifyApp:
         Args:
             csv_file_path (str): The path to the input CSV file.
             jsonl_file_path (str): The path where the output JSONL file will be saved.
+                A Parquet file (.parquet) is read too; only the columns used are loaded.
             mode (str): The conversion mode. Options:
                 - 'product': Create/update products with full details
                 - 'variant': Create/update product variants
                 - 'publish': Publish products to sales channels
+                - 'update': Update existing products (ProductUpdateInput)
                 - 'metafield': Update only product metafields
             locationId (str, optional): Location ID for inventory operations (used with 'variant' mode).
+            skip_handles (set, optional): Handles to leave out, e.g. products unchanged since the last push.
+            workers (int, optional): Build the records in this many processes (see product_groups_to_jsonl()).
+            stream (bool): Convert the file rows_per_read rows at a time instead of loading
+                it whole, for files larger than memory (see _stream_csv_to_jsonl()).
+            rows_per_read (int): Number of rows read at a time when streaming.
         
         Supported Metafield Columns (for 'metafield' mode):
             - Vendor SKU
@@ -196,11 +1658,50 @@ class ShopifyApp:
             # Update metafields and bulk update
             app.csv_to_jsonl('data/products.csv', 'data/products.jsonl', mode='metafield')
             app.update_products_bulk('data/products.csv', 'data/products.jsonl')
+
+            # Several modes from one read: see load_product_groups()
+
+            # A multi-GB supplier export, in constant memory
+            app.csv_to_jsonl('data/supplier.csv', 'data/products.jsonl', mode='product', stream=True)
+        """
+        if stream:
+            self._stream_csv_to_jsonl(csv_file_path, jsonl_file_path, mode, locationId=locationId, skip_handles=skip_handles,
+                                      rows_per_read=rows_per_read)
+            print(f"Successfully converted '{csv_file_path}' to '{jsonl_file_path}'")
+            return
+
+        groups = self.load_product_groups(csv_file_path, skip_handles=skip_handles)
+        if groups is None:
+            return
+
+        self.product_groups_to_jsonl(groups, jsonl_file_path, mode, locationId=locationId, workers=workers)
+        print(f"Successfully converted '{csv_file_path}' to '{jsonl_file_path}'")
+
+    def load_product_groups(self, csv_file_path, skip_handles=None):
+        """
+        Reads a product CSV (or Parquet file) and groups its rows by handle, once,
+        for product_groups_to_jsonl() to build the JSONL of every mode from. The
+        product ids and publications looked up for one mode are kept in the
+        returned groups and reused by the next mode.
+
+        Args:
+            csv_file_path (str): The path to the input CSV file.
+            skip_handles (set, optional): Handles to leave out.
+
+        Returns:
+            dict: The grouped rows, or None if the file could not be read.
+
+        Example:
+            groups = app.load_product_groups('data/products.csv')
+            app.product_groups_to_jsonl(groups, 'data/products.jsonl', mode='product')
+            # ... once the products exist
+            app.product_groups_to_jsonl(groups, 'data/variants.jsonl', mode='variant', locationId=locationId)
+            app.product_groups_to_jsonl(groups, 'data/publish.jsonl', mode='publish')
         """
         try:
             # Using keep_default_na=False to prevent pandas from interpreting empty strings as NaN,
             # and then filling any actual NaN values (from other reasons) with empty strings.
-            df = pd.read_csv(csv_file_path, keep_default_na=False).fillna('')
+            df = self._read_product_table(csv_file_path, columns=['ID', 'Handle', *PRODUCT_JSONL_COLUMNS]).fillna('')
         except FileNotFoundError:
             print(f"Error: CSV file not found at '{csv_file_path}'")
             return
@@ -208,252 +1709,53 @@ class ShopifyApp:
             print(f"Error reading CSV file: {e}")
             return
 
-        datas = []
+        if skip_handles:
+            df = df[~df['Handle'].isin(skip_handles)]
 
         # Group by 'Handle' first to process all rows for a product together
         # This simplifies gathering all options, media, and variants for a single product.
-        agg_dict = {
-                'Title': 'first',
-                'Body (HTML)': 'first',
-                'Vendor': 'first',
-                'Product Category': 'first',
-                'Type': 'first',
-                'Tags': 'first',
-                'Published': 'first',
-                'Option1 Name': 'first',
-                'Option1 Value': list,
-                'Option1 Linked To': list,
-                'Option2 Name': 'first',
-                'Option2 Value': list,
-                'Option2 Linked To': list,
-                'Option3 Name': 'first',
-                'Option3 Value': list,
-                'Option3 Linked To': list,
-                'Variant SKU': list,
-                'Variant Grams': list,
-                'Variant Inventory Tracker': list,
-                'Variant Inventory Policy': list,
-                'Variant Fulfillment Service': list,
-                'Variant Price': list,
-                'Variant Compare At Price': list,
-                'Variant Requires Shipping': list,
-                'Variant Taxable': list,
-                'Variant Barcode': list,
-                'Image Src': list,
-                'Image Position': list,
-                'Image Alt Text': list,
-                'Gift Card': 'first',
-                'SEO Title': 'first',
-                'SEO Description': 'first',
-                'Variant Image': list,
-                'Variant Weight Unit': list,
-                'Cost per item': list,
-                'Status': 'first',
-                'Available Qty': list,
-                'Vendor SKU': 'first',
-                'enable_best_price (product.metafields.custom.enable_best_price)': 'first',
-                'arrives_before_christmas (product.metafields.custom.arrives_before_christmas)': 'first',
-                'info_meta_text (product.metafields.custom.info_meta_text)': 'first'
-            }
-        
-        # Add ID column if it exists in the CSV
-        if 'ID' in df.columns:
-            agg_dict['ID'] = 'first'
-        
-        grouped_df = df.groupby('Handle').agg(agg_dict).reset_index()
-
-        if mode == 'product':
-            for index, row in grouped_df.iterrows():
-                product_entry = {
-                    'product': { 
-                        'id': str(row['ID']).strip() if 'ID' in row.index and row['ID'] else '',
-                        'handle': row['Handle'],
-                        'title': str(row['Title']).strip() if row['Title'] else '',
-                        'descriptionHtml': str(row['Body (HTML)']).strip() if row['Body (HTML)'] else '',
-                        'vendor': str(row['Vendor']).strip() if row['Vendor'] else '',
-                        # 'category': str(row['Product Category']).strip() if row['Product Category'] else '', # Changed from 'Standard Product Category' based on your provided code
-                        'category': 'gid://shopify/TaxonomyCategory/tg-5-20-1',
-                        'productType': str(row['Type']).strip() if row['Type'] else '', # Changed from 'Product Type' based on your provided code
-                        'tags': [tag.strip() for tag in str(row['Tags']).split(',') if tag.strip()] if row['Tags'] else [],
-                        'productOptions': [],
-                        'giftCard': str(row['Gift Card']).strip().lower() == 'true',
-                        'seo': {
-                            'title': str(row['SEO Title']).strip() if row['SEO Title'] else '',
-                            'description': str(row['SEO Description']).strip() if row['SEO Description'] else ''
-                        },
-                        'status': str(row['Status']).strip().upper() if row['Status'] else 'ACTIVE',
-                        'metafields': []
-                    },
-                    # 'media': []
-                }
-
-                # --- Process Product Options (Gather all unique options and their values for this product) ---
-                productOptions = list()
-                
-                for i in range(1, 4):
-                    productOption = {'name': None, 'values':[]}
-                    option_name_col = f'Option{i} Name'
-                    option_value_col = f'Option{i} Value'
-                    if option_name_col in grouped_df.columns:
-                        productOption['name'] = row[option_name_col]
-                    if option_value_col in grouped_df.columns:
-                        option_value_list = row[option_value_col]
-                        unique_values = []
-                        for item in option_value_list:
-                            if item not in unique_values and item != '':
-                                unique_values.append(item)
-                        for item in unique_values:
-                            productOption['values'].append({'name': item})
-                    if productOption['name'] != '':
-                        productOptions.append(productOption)
-
-                product_entry['product']['productOptions'] = productOptions
-
-                metafields = []
-                if row['Vendor SKU']:
-                    try:
-                        vendorSKU = {'namespace': 'custom', 'key': 'vendor_sku', 'value': str(int(float(row['Vendor SKU']))), 'type': 'single_line_text_field'}
-                    except:
-                        vendorSKU = {'namespace': 'custom', 'key': 'vendor_sku', 'value': str(row['Vendor SKU']), 'type': 'single_line_text_field'}
-                    metafields.append(vendorSKU)
-                if row['enable_best_price (product.metafields.custom.enable_best_price)']:
-                    # Convert boolean value to string
-                    enable_best_price_val = str(row['enable_best_price (product.metafields.custom.enable_best_price)']).lower()
-                    enableBestPrice = {'namespace': 'custom', 'key': 'enable_best_price', 'value': enable_best_price_val, 'type': 'boolean'}
-                    metafields.append(enableBestPrice)
-                if row['arrives_before_christmas (product.metafields.custom.arrives_before_christmas)']:
-                    # Convert boolean value to string
-                    arrives_val = str(row['arrives_before_christmas (product.metafields.custom.arrives_before_christmas)']).lower()
-                    arrivesBeforeChristmas = {'namespace': 'custom', 'key': 'arrives_before_christmas', 'value': arrives_val, 'type': 'boolean'}
-                    metafields.append(arrivesBeforeChristmas)
-                if row['info_meta_text (product.metafields.custom.info_meta_text)']:
-                    infoMetaText = {'namespace': 'custom', 'key': 'info_meta_text', 'value': row['info_meta_text (product.metafields.custom.info_meta_text)'], 'type': 'single_line_text_field'}
-                    metafields.append(infoMetaText)
-                product_entry['product']['metafields'] = metafields
-
-                datas.append(product_entry)
-
-        if mode == 'variant':
-            handles = grouped_df['Handle'].tolist()
-            response = self.get_products_id_by_handle(handles=handles)
-            edges = response['data']['products']['edges']
-            records = [x['node'] for x in edges]
-            product_id_df = pd.DataFrame.from_records(records)
-            grouped_id_df = pd.merge(grouped_df, product_id_df, how='left', left_on='Handle', right_on='handle')
-            for index, row in grouped_id_df.iterrows():
-                variants_entry = {
-                    'media': [],
-                    'productId': row['id'],
-                    'variants': [],
-                    'strategy': 'REMOVE_STANDALONE_VARIANT'
-                }
+        return self._group_product_rows(df)
 
-                variants = list()
-
-                for i in range(len(row['Variant SKU']) - 1):
-                    if row['Variant SKU'][i] != '' and row['Variant SKU'][i] is not None:
-                        listMediaSrc = list()
-                        listMediaSrc.append(str(row['Variant Image'][i]).strip() if row['Variant Image'][i] else ''),
-                        variant = {
-                            'optionValues': [],
-                            'inventoryItem': {
-                                'sku': row['Variant SKU'][i],
-                                'tracked' : str(row['Variant Inventory Tracker'][i]).strip().lower() == 'shopify',
-                                'requiresShipping': str(row['Variant Requires Shipping'][i]).strip().lower() == 'true',
-                                'cost': float(row['Cost per item'][i]) if row['Cost per item'][i] else 0.0,
-                                'measurement':{
-                                    'weight':{
-                                        # 'unit': str(row['Variant Weight Unit'][i]).strip().upper() if row['Variant Weight Unit'][i] else 'GRAMS',
-                                        'unit': 'GRAMS',
-                                        'value': float(row['Variant Grams'][i]) if row['Variant Grams'][i] else 0.0
-                                    }
-                                }
-                            },
-                            'inventoryPolicy': 'DENY',
-                            'inventoryQuantities': [],
-                            'price': float(row['Variant Price'][i]) if row['Variant Price'][i] else 0.0,
-                            'compareAtPrice': float(row['Variant Compare At Price'][i]) if row['Variant Compare At Price'][i] else None,
-                            'taxable': str(row['Variant Taxable'][i]).strip().lower() == 'true',
-                            'barcode': str(int(float(row['Variant Barcode'][i]))).strip() if row['Variant Barcode'][i] else '',
-                            'mediaSrc': listMediaSrc
-                        }
+    def product_groups_to_jsonl(self, groups, jsonl_file_path, mode, locationId=None, workers=None, keep_shards=False):
+        """
+        Writes the JSONL of one csv_to_jsonl() mode from rows grouped by
+        load_product_groups().
 
-                        # Clean up None values in compareAtPrice
-                        if variant['compareAtPrice'] is None:
-                            del variant['compareAtPrice']
-                        
-                        option_values = []
-                        for j in range(1, 4):
-                            optionValue = {}
-                            option_name_col = f'Option{j} Name'
-                            option_value_col = f'Option{j} Value'
-                            if row[option_name_col] != '':
-                                optionValue['optionName'] = row[option_name_col]
-                            if len(row[option_value_col]) > 0:
-                                optionValue['name'] = row[option_value_col][i]
-                            if optionValue['name'] != '':
-                                if len(optionValue) > 0:
-                                    option_values.append(optionValue)
-                                    
-                        variant['optionValues'] = option_values.copy()
-
-                        quantities = []
-                        for qty in row['Available Qty']:
-                            if qty != '':
-                                quantity = {
-                                    'availableQuantity': int(qty),
-                                    'locationId': locationId
-                                }
-                            
-                                quantities.append(quantity)
+        With workers, the handles are split into that many contiguous ranges of
+        about equal row counts, and each range is encoded into its own shard file
+        by a separate process. Shards are concatenated in handle order, so the
+        file is the same as the one written by a single process. Workers start
+        as fresh interpreters, which only pays off for large files.
 
-                        variant['inventoryQuantities'] = quantities.copy()
+        Args:
+            groups (dict): Grouped rows returned by load_product_groups().
+            jsonl_file_path (str): The path where the output JSONL file will be saved.
+            mode (str): 'product', 'variant', 'publish' or 'update' (see csv_to_jsonl()).
+            locationId (str, optional): Location ID for inventory operations (used with 'variant' mode).
+            workers (int, optional): Number of worker processes.
+            keep_shards (bool): Leave the shards (<name>.partNNN.jsonl) as they are
+                instead of concatenating them into jsonl_file_path.
 
-                        variants.append(variant)
+        Returns:
+            list: The files written: jsonl_file_path, or the shards with keep_shards.
+        """
+        product_id_df = None
+        publication_ids = None
 
-                variants_entry['variants'] = variants
-                                
-                media_list = list()
-                for i in range(len(row['Image Src'])): 
-                    media = {
-                        'mediaContentType': 'IMAGE',
-                        'originalSource': str(row['Image Src'][i]).strip() if row['Image Src'][i] else ''
-                    }
-                    if media['originalSource'] != '' and media['originalSource'] not in media_list:
-                        media_list.append(media)
-                
-                variant_medias = [{'mediaContentType': 'IMAGE', 'originalSource': row.strip()} for row in list(set(listMediaSrc))]
-                media_list.extend(variant_medias)          
-                variants_entry['media'] = media_list.copy()     
-                datas.append(variants_entry.copy())
+        if mode in ('variant', 'publish'):
+            product_id_df = self._group_product_ids(groups)
         
         if mode == 'publish':
-            handles = grouped_df['Handle'].tolist()
-            response = self.get_products_id_by_handle(handles=handles)
-            edges = response['data']['products']['edges']
-            records = [x['node'] for x in edges]
-            product_id_df = pd.DataFrame.from_records(records)
-            grouped_id_df = pd.merge(grouped_df, product_id_df, how='left', left_on='Handle', right_on='handle')
-            
-            response = self.query_publication()
-            nodes = response['data']['publications']['nodes']
-            publication_ids = [x['id'] for x in nodes]
-            
-            publications = []
-            for publication_id in publication_ids: 
-                publication = {
-                    'publicationId': publication_id
-                }
-                publications.append(publication)
+            if 'publication_ids' not in groups:
+                response = self.query_publication()
+                nodes = response['data']['publications']['nodes']
+                groups['publication_ids'] = [x['id'] for x in nodes]
+            publication_ids = groups['publication_ids']
 
-            for index, row in grouped_id_df.iterrows():
-                if str(row['Published']).strip().lower() == 'true':
-                    publish_entry = {
-                        'id': row['id'],
-                        'input': []
-                    }
-                    publish_entry['input'] = publications
-                    datas.append(publish_entry)
+        if workers and workers > 1 and len(groups['first']) > 1:
+            return self._write_jsonl_shards(groups, jsonl_file_path, mode, product_id_df, publication_ids, locationId, workers, keep_shards)
+
+        datas = self._mode_records(groups, mode, product_id_df=product_id_df, publication_ids=publication_ids, locationId=locationId)
 
         # if mode == 'metafield':
         #     """
@@ -558,39 +1860,453 @@ class ShopifyApp:
         #     else:
         #         print("Warning: Could not fetch products from Shopify")
 
+        self._write_jsonl(datas, jsonl_file_path)
+        return [jsonl_file_path]
+
+    def _mode_records(self, groups, mode, product_id_df=None, publication_ids=None, locationId=None, last_variant_image=None):
+        """
+        Builds the JSONL records of a csv_to_jsonl() mode. Unknown modes have none.
+        """
+        if mode == 'product':
+            return self._product_records(groups)
+        if mode == 'update':
+            return self._update_records(groups)
+        if mode == 'variant':
+            return self._variant_records(groups, product_id_df, locationId=locationId, last_variant_image=last_variant_image)
+        if mode == 'publish':
+            return self._publish_records(groups, product_id_df, publication_ids)
+        return []
+
+    @staticmethod
+    def _write_jsonl(datas, jsonl_file_path):
         # Write product data to JSONL file
-        with open(jsonl_file_path, 'w', encoding='utf-8') as outfile:
-            for data in datas:
-                outfile.write(json.dumps(data, ensure_ascii=False) + '\n')
-        print(f"Successfully converted '{csv_file_path}' to '{jsonl_file_path}'")
+        return _write_jsonl_records(datas, jsonl_file_path)
 
-    # Create
-    # ===================================== Session ====================================
-    def create_session(self):
-        print("Creating session...")
-        client = Client(timeout=None)
-        headers = {
-            'X-Shopify-Access-Token': self.access_token,
-            'Content-Type': 'application/json'
+    def _write_jsonl_shards(self, groups, jsonl_file_path, mode, product_id_df, publication_ids, locationId, workers, keep_shards):
+        """
+        Splits the grouped handles into contiguous ranges of about equal row
+        counts and writes the records of every range from a process pool.
+        """
+        rows = groups['rows']
+        starts = groups['starts']
+        ends = groups['ends']
+        group_count = len(starts)
+
+        # First group of every range after the first one
+        cuts = np.searchsorted(ends, np.arange(1, workers) * len(rows) / workers) + 1
+        bounds = [0, *sorted(set(np.clip(cuts, 1, group_count - 1).tolist())), group_count]
+
+        # A variant record carries the image of the variant built before it, which may
+        # belong to the previous range, so every range starts from that image
+        seeds = [None] * (len(bounds) - 1)
+        if mode == 'variant':
+            is_variant = self._variant_row_mask(groups)
+            variant_groups = groups['group_ids'][is_variant]
+            images = _stripped_or_empty(rows['Variant Image'][is_variant])
+            for n, bound in enumerate(bounds[:-1]):
+                previous = int(np.searchsorted(variant_groups, bound)) - 1
+                seeds[n] = images[previous] if previous >= 0 else None
+
+        base, extension = os.path.splitext(jsonl_file_path)
+        shard_paths = [f'{base}.part{n:03d}{extension}' for n in range(len(bounds) - 1)]
+        print(f'Writing {mode} JSONL in {len(shard_paths)} shards with {workers} workers...')
+        # Spawned workers do not inherit the event loop thread or open connections
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [
+                executor.submit(
+                    _write_jsonl_shard, rows.iloc[starts[first]:ends[last - 1]], mode, shard_path,
+                    product_id_df=product_id_df, publication_ids=publication_ids, locationId=locationId, last_variant_image=seed
+                )
+                for first, last, shard_path, seed in zip(bounds[:-1], bounds[1:], shard_paths, seeds)
+            ]
+            record_count = sum(future.result() for future in futures)
+        print(f'Wrote {record_count} {mode} records')
+
+        if keep_shards:
+            return shard_paths
+
+        with open(jsonl_file_path, 'wb') as outfile:
+            for shard_path in shard_paths:
+                with open(shard_path, 'rb') as infile:
+                    shutil.copyfileobj(infile, outfile)
+                os.remove(shard_path)
+        return [jsonl_file_path]
+
+    def _stream_csv_to_jsonl(self, csv_file_path, jsonl_file_path, mode, locationId=None, skip_handles=None, rows_per_read=10000):
+        """
+        Streaming csv_to_jsonl(): reads rows_per_read rows at a time, carries the
+        last (possibly partial) handle over to the next block and writes the
+        records of every block once its handles are complete, so memory use does
+        not depend on the file size.
+
+        This relies on the rows of a handle being contiguous, as in Shopify
+        exports. A handle that shows up again after other handles raises a
+        ValueError and the partial output is removed; convert such a file without
+        stream. Records follow the file's handle order (csv_to_jsonl() sorts
+        handles), and a CSV is read twice: once to settle the column types the
+        way a whole-file read infers them, then to convert.
+        """
+        columns = ['ID', 'Handle', *PRODUCT_JSONL_COLUMNS]
+        dtype = None if _is_parquet(csv_file_path) else self._csv_column_dtypes(csv_file_path, columns=columns, rows_per_read=rows_per_read)
+        reader = self._iter_product_table(csv_file_path, rows_per_read=rows_per_read, columns=columns, text=False, dtype=dtype)
+
+        seen_handles = set()
+        publication_ids = None
+        last_variant_image = None
+        record_count = 0
+        try:
+            with _open_jsonl(jsonl_file_path, 'wb') as outfile:
+                for rows, starts, ends in self._iter_handle_blocks(reader):
+                    for handle in rows['Handle'].to_numpy()[starts].tolist():
+                        if handle in seen_handles:
+                            raise ValueError(f"Handle '{handle}' is not contiguous in '{csv_file_path}'; convert it without stream")
+                        seen_handles.add(handle)
+
+                    # NaN can only come from numeric columns here; it becomes '' as in csv_to_jsonl()
+                    rows = rows.assign(**{col: rows[col].fillna('') for col in rows.columns if rows[col].dtype.kind == 'f' and rows[col].isna().any()})
+                    if skip_handles:
+                        rows = rows[~rows['Handle'].isin(skip_handles)]
+                        if len(rows) == 0:
+                            continue
+                    groups = self._group_product_rows(rows)
+
+                    product_id_df = None
+                    if mode in ('variant', 'publish'):
+                        product_id_df = self._product_id_frame(handles=groups['first']['Handle'].tolist())
+                    if mode == 'publish' and publication_ids is None:
+                        response = self.query_publication()
+                        publication_ids = [x['id'] for x in response['data']['publications']['nodes']]
+
+                    datas = self._mode_records(groups, mode, product_id_df=product_id_df, publication_ids=publication_ids,
+                                               locationId=locationId, last_variant_image=last_variant_image)
+                    for data in datas:
+                        outfile.write(_dumps_jsonl(data))
+                        record_count += 1
+
+                    # The next block's variant records continue from this block's last variant image
+                    if mode == 'variant':
+                        is_variant = self._variant_row_mask(groups)
+                        if is_variant.any():
+                            last_variant_image = _stripped_or_empty(groups['rows']['Variant Image'][is_variant])[-1]
+        except ValueError:
+            os.remove(jsonl_file_path)
+            raise
+
+        print(f'Streamed {record_count} {mode} records for {len(seen_handles)} handles')
+        return record_count
+
+    def _group_product_ids(self, groups):
+        """
+        Returns the product ids of the grouped handles as a DataFrame with handle
+        and id columns. Once every handle resolved, the ids are kept in groups.
+        """
+        product_id_df = groups.get('product_id_df')
+        if product_id_df is None:
+            product_id_df = self._product_id_frame(handles=groups['first']['Handle'].tolist())
+            if len(product_id_df) == len(groups['first']):
+                groups['product_id_df'] = product_id_df
+        return product_id_df
+
+    def _group_product_rows(self, df):
+        """
+        Orders the CSV rows the way groupby('Handle') does (sorted handles, file
+        order within a handle) and returns the rows, the first row of every
+        handle and the row range of every handle.
+        """
+        missing = [col for col in PRODUCT_JSONL_COLUMNS if col not in df.columns]
+        if missing:
+            raise KeyError(f"Column(s) {missing} do not exist")
+
+        rows = df[df['Handle'].notna()].sort_values('Handle', kind='stable').reset_index(drop=True)
+        starts, ends = self._handle_ranges(rows)
+        group_ids = np.repeat(np.arange(len(starts)), ends - starts)
+
+        return {
+            'rows': rows,
+            'first': rows.iloc[starts].reset_index(drop=True),
+            'starts': starts,
+            'ends': ends,
+            'group_ids': group_ids,
         }
-        client.headers.update(headers)
-        self.client = client
 
-    # ===================================== Products ===================================
-    def create_product(self, variables):
-        print("Creating product...")
-        mutation = '''
-            mutation (
-                $handle: String,
-                $title: String,
-                $descriptionHtml: String,
-                $vendor: String,
-                $category: ID,
-                $productType: String,
-                $tags: [String!],
-                $productOptions:[OptionCreateInput!],
-                $media: [CreateMediaInput!],
-                $giftCard:Boolean,
+    def _product_records(self, groups):
+        """
+        Yields the 'product' mode JSONL records (ProductCreateInput), one at a
+        time, from columns converted for all groups up front.
+        """
+        rows = groups['rows']
+        first = groups['first']
+        group_ids = groups['group_ids']
+        group_count = len(first)
+
+        if 'ID' in first.columns:
+            ids = _stripped_or_empty(first['ID'])
+        else:
+            ids = [''] * group_count
+        handles = first['Handle'].tolist()
+        titles = _stripped_or_empty(first['Title'])
+        descriptions = _stripped_or_empty(first['Body (HTML)'])
+        vendors = _stripped_or_empty(first['Vendor'])
+        product_types = _stripped_or_empty(first['Type'])
+        gift_cards = _is_text(first['Gift Card'], 'true')
+        seo_titles = _stripped_or_empty(first['SEO Title'])
+        seo_descriptions = _stripped_or_empty(first['SEO Description'])
+        statuses = np.where(_truthy(first['Status']), _stripped(first['Status']).str.upper(), 'ACTIVE').tolist()
+
+        # Tags: split on commas, trim and drop empty tags
+        tags = [[] for _ in range(group_count)]
+        has_tags = _truthy(first['Tags'])
+        if has_tags.any():
+            tag_parts = first['Tags'][has_tags].astype(str).str.split(',').explode().str.strip()
+            tag_parts = tag_parts[tag_parts != '']
+            for group_id, tag_list in tag_parts.groupby(level=0, sort=False).agg(list).items():
+                tags[group_id] = tag_list
+
+        # Options: first name of the handle, distinct non-empty values in file order
+        options = []
+        for i in range(1, 4):
+            names = first[f'Option{i} Name'].tolist()
+            values = rows[f'Option{i} Value']
+            present = _non_empty(values)
+            distinct = pd.DataFrame({'group': group_ids[present], 'value': values[present].tolist()}).drop_duplicates()
+            options.append((names, _split_by_group(distinct['group'].to_numpy(), distinct['value'].tolist(), group_count)))
+
+        # Metafields
+        vendor_sku_col = first['Vendor SKU']
+        best_price_col = first['enable_best_price (product.metafields.custom.enable_best_price)']
+        christmas_col = first['arrives_before_christmas (product.metafields.custom.arrives_before_christmas)']
+        info_col = first['info_meta_text (product.metafields.custom.info_meta_text)']
+        vendor_skus = _convert(vendor_sku_col, _to_vendor_sku, None)
+        best_prices = np.where(_truthy(best_price_col), best_price_col.astype(str).str.lower(), None).tolist()
+        christmas = np.where(_truthy(christmas_col), christmas_col.astype(str).str.lower(), None).tolist()
+        infos = info_col.tolist()
+        has_infos = _truthy(info_col).tolist()
+
+        for k in range(group_count):
+            productOptions = []
+            for names, values in options:
+                if names[k] != '':
+                    productOptions.append({'name': names[k], 'values': [{'name': item} for item in values[k]]})
+
+            metafields = []
+            if vendor_skus[k] is not None:
+                metafields.append({'namespace': 'custom', 'key': 'vendor_sku', 'value': vendor_skus[k], 'type': 'single_line_text_field'})
+            if best_prices[k] is not None:
+                metafields.append({'namespace': 'custom', 'key': 'enable_best_price', 'value': best_prices[k], 'type': 'boolean'})
+            if christmas[k] is not None:
+                metafields.append({'namespace': 'custom', 'key': 'arrives_before_christmas', 'value': christmas[k], 'type': 'boolean'})
+            if has_infos[k]:
+                metafields.append({'namespace': 'custom', 'key': 'info_meta_text', 'value': infos[k], 'type': 'single_line_text_field'})
+
+            yield {
+                'product': {
+                    'id': ids[k],
+                    'handle': handles[k],
+                    'title': titles[k],
+                    'descriptionHtml': descriptions[k],
+                    'vendor': vendors[k],
+                    'category': 'gid://shopify/TaxonomyCategory/tg-5-20-1',
+                    'productType': product_types[k],
+                    'tags': tags[k],
+                    'productOptions': productOptions,
+                    'giftCard': gift_cards[k],
+                    'seo': {
+                        'title': seo_titles[k],
+                        'description': seo_descriptions[k]
+                    },
+                    'status': statuses[k],
+                    'metafields': metafields
+                },
+            }
+
+    def _update_records(self, groups):
+        """
+        Yields the 'update' mode JSONL records (ProductUpdateInput): the product
+        records passed through the update stages.
+        """
+        return _apply_stages(self._product_records(groups), [self._update_input_stage])
+
+    def _update_input_stage(self, records):
+        # Reduces each ProductCreateInput record to the fields ProductUpdateInput accepts
+        for data in records:
+            yield {**data, 'product': self._update_product_input(data['product'])}
+
+    def _variant_row_mask(self, groups):
+        # The last row of every handle is not turned into a variant
+        rows = groups['rows']
+        is_last = np.zeros(len(rows), dtype=bool)
+        is_last[groups['ends'] - 1] = True
+        sku_col = rows['Variant SKU']
+        return ~is_last & _non_empty(sku_col) & (sku_col.to_numpy() != None)
+
+    def _variant_records(self, groups, product_id_df, locationId=None, last_variant_image=None):
+        """
+        Builds the 'variant' mode JSONL records (productVariantsBulkCreate input).
+        last_variant_image is the image of the variant built before the first
+        group, when the groups continue an earlier range.
+        """
+        rows = groups['rows']
+        first = groups['first']
+        group_ids = groups['group_ids']
+        group_count = len(first)
+        product_ids = pd.merge(first[['Handle']], product_id_df, how='left', left_on='Handle', right_on='handle')['id'].tolist()
+
+        is_variant = self._variant_row_mask(groups)
+
+        variant_rows = rows[is_variant]
+        variant_groups = group_ids[is_variant]
+        skus = variant_rows['Variant SKU'].tolist()
+        images = _stripped_or_empty(variant_rows['Variant Image'])
+        tracked = _is_text(variant_rows['Variant Inventory Tracker'], 'shopify')
+        requires_shipping = _is_text(variant_rows['Variant Requires Shipping'], 'true')
+        costs = _convert(variant_rows['Cost per item'], _to_float, 0.0)
+        grams = _convert(variant_rows['Variant Grams'], _to_float, 0.0)
+        prices = _convert(variant_rows['Variant Price'], _to_float, 0.0)
+        compare_at_prices = _convert(variant_rows['Variant Compare At Price'], _to_float, None)
+        taxable = _is_text(variant_rows['Variant Taxable'], 'true')
+        barcodes = _convert(variant_rows['Variant Barcode'], _to_barcode, '')
+        option_names = [first[f'Option{j} Name'].tolist() for j in range(1, 4)]
+        option_values = [variant_rows[f'Option{j} Value'].tolist() for j in range(1, 4)]
+        variant_positions = _split_by_group(variant_groups, np.arange(len(variant_rows)), group_count)
+
+        # Every variant gets the quantities of all rows of its handle
+        qty_col = rows['Available Qty']
+        has_qty = _non_empty(qty_col)
+        quantities = _split_by_group(group_ids[has_qty], _convert(qty_col[has_qty], _to_int, 0), group_count)
+
+        image_col = rows['Image Src']
+        sources = pd.Series(_stripped_or_empty(image_col))
+        has_source = (sources != '').to_numpy()
+        media_sources = _split_by_group(group_ids[has_source], sources[has_source].tolist(), group_count)
+
+        datas = []
+        for k in range(group_count):
+            variants = []
+            for v in variant_positions[k]:
+                variant = {
+                    'optionValues': [],
+                    'inventoryItem': {
+                        'sku': skus[v],
+                        'tracked' : tracked[v],
+                        'requiresShipping': requires_shipping[v],
+                        'cost': costs[v],
+                        'measurement':{
+                            'weight':{
+                                'unit': 'GRAMS',
+                                'value': grams[v]
+                            }
+                        }
+                    },
+                    'inventoryPolicy': 'DENY',
+                    'inventoryQuantities': [],
+                    'price': prices[v],
+                    'compareAtPrice': compare_at_prices[v],
+                    'taxable': taxable[v],
+                    'barcode': barcodes[v],
+                    'mediaSrc': [images[v]]
+                }
+
+                # Clean up None values in compareAtPrice
+                if variant['compareAtPrice'] is None:
+                    del variant['compareAtPrice']
+
+                option_values_entry = []
+                for j in range(3):
+                    optionValue = {}
+                    if option_names[j][k] != '':
+                        optionValue['optionName'] = option_names[j][k]
+                    optionValue['name'] = option_values[j][v]
+                    if optionValue['name'] != '':
+                        option_values_entry.append(optionValue)
+                variant['optionValues'] = option_values_entry
+
+                variant['inventoryQuantities'] = [{'availableQuantity': qty, 'locationId': locationId} for qty in quantities[k]]
+
+                variants.append(variant)
+                last_variant_image = images[v]
+
+            media_list = [{'mediaContentType': 'IMAGE', 'originalSource': source} for source in media_sources[k]]
+            # The image of the most recently built variant is appended as extra media
+            if last_variant_image is not None:
+                media_list.append({'mediaContentType': 'IMAGE', 'originalSource': last_variant_image.strip()})
+
+            datas.append({
+                'media': media_list,
+                'productId': product_ids[k],
+                'variants': variants,
+                'strategy': 'REMOVE_STANDALONE_VARIANT'
+            })
+
+        return datas
+
+    def _publish_records(self, groups, product_id_df, publication_ids):
+        """
+        Builds the 'publish' mode JSONL records (publishablePublish input) for
+        the handles marked as published.
+        """
+        first = groups['first']
+        product_ids = pd.merge(first[['Handle']], product_id_df, how='left', left_on='Handle', right_on='handle')['id'].tolist()
+        published = _is_text(first['Published'], 'true')
+        publications = [{'publicationId': publication_id} for publication_id in publication_ids]
+
+        return [{'id': product_id, 'input': publications} for product_id, is_published in zip(product_ids, published) if is_published]
+
+    # Create
+    # ===================================== Session ====================================
+    def create_session(self):
+        print("Creating session...")
+        client = Client(timeout=None)
+        headers = {
+            'X-Shopify-Access-Token': self.access_token,
+            'Content-Type': 'application/json'
+        }
+        client.headers.update(headers)
+        self.client = client
+
+        # The async client lives on the background loop used by send_request
+        self._ensure_loop()
+        limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        self.async_client = AsyncClient(timeout=None, headers=headers, limits=limits)
+
+    def close_session(self):
+        print("Closing session...")
+        if self.async_client:
+            self._run(self.async_client.aclose())
+            self.async_client = None
+        if self.client:
+            self.client.close()
+            self.client = None
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+            self._loop = None
+            self._loop_thread = None
+            self._semaphore = None
+        if self.handle_cache is not None:
+            self.handle_cache.close()
+        if self.import_journal is not None:
+            self.import_journal.close()
+        if self.product_hashes is not None:
+            self.product_hashes.close()
+        if self.catalog is not None:
+            self.catalog.close()
+
+    # ===================================== Products ===================================
+    async def create_product_async(self, variables):
+        print("Creating product...")
+        mutation = '''
+            mutation (
+                $handle: String,
+                $title: String,
+                $descriptionHtml: String,
+                $vendor: String,
+                $category: ID,
+                $productType: String,
+                $tags: [String!],
+                $productOptions:[OptionCreateInput!],
+                $media: [CreateMediaInput!],
+                $giftCard:Boolean,
                 $seo: SEOInput,
                 $status: ProductStatus
             )
@@ -622,15 +2338,35 @@ class ShopifyApp:
             }
         '''
 
-        response = self.send_request(query=mutation, variables=variables)
+        response = await self.send_request_async(query=mutation, variables=variables)
         product_data = response
+        product_id = product_data['data']['productCreate']['product']['id']
 
+        tasks = []
         if variables['published'] is True:
-            publication_data = self.query_publication()
+            publication_data = await self.query_publication_async()
             publication_input = [{'publicationId': item['id']} for item in publication_data['data']['publications']['nodes']]
-            self.publish_product(product_id=product_data['data']['productCreate']['product']['id'], publication_input=publication_input)
+            tasks.append(self.publish_product_async(product_id=product_id, publication_input=publication_input))
 
-        self.create_variant(product_id=product_data['data']['productCreate']['product']['id'], variants=variables['variants'], media=variables['media'], strategy='REMOVE_STANDALONE_VARIANT')
+        # Publishing and variant creation only depend on the product id, so they run together
+        tasks.append(self.create_variant_async(product_id=product_id, variants=variables['variants'], media=variables['media'], strategy='REMOVE_STANDALONE_VARIANT'))
+        await self.gather_bounded(tasks)
+
+    def create_product(self, variables):
+        return self._run(self.create_product_async(variables=variables))
+
+    async def create_products_concurrently_async(self, variables_list):
+        return await self.gather_bounded([self.create_product_async(variables=variables) for variables in variables_list])
+
+    def create_products_concurrently(self, variables_list):
+        """
+        Creates several products through the non-bulk create_product chain,
+        running up to max_concurrency requests at a time.
+
+        Args:
+            variables_list (list): List of variables dicts as accepted by create_product().
+        """
+        return self._run(self.create_products_concurrently_async(variables_list=variables_list))
 
     # =================================== staged_target ================================
     def generate_staged_target(self):
@@ -665,7 +2401,7 @@ class ShopifyApp:
         return self.send_request(query=mutation)
 
     # ================================== Create Variant ===============================
-    def create_variant(self, product_id, variants, media, strategy='DEFAULT'):
+    async def create_variant_async(self, product_id, variants, media, strategy='DEFAULT'):
         print('Creating Variant...')
         mutation = '''
             mutation productVariantsBulkCreate($productId: ID!, $variants: [ProductVariantsBulkInput!]!, $media: [CreateMediaInput!], $strategy: ProductVariantsBulkCreateStrategy) {
@@ -700,7 +2436,10 @@ class ShopifyApp:
             'strategy': strategy
         }
 
-        return self.send_request(query=mutation, variables=variables)
+        return await self.send_request_async(query=mutation, variables=variables)
+
+    def create_variant(self, product_id, variants, media, strategy='DEFAULT'):
+        return self._run(self.create_variant_async(product_id=product_id, variants=variants, media=media, strategy=strategy))
 
     # ================================== Create Products Bulk ==============================    
     def create_products(self, staged_target):
@@ -791,56 +2530,337 @@ class ShopifyApp:
         return response
 
     # ================================== Import Bulk Data ================================
-    def import_bulk_data(self, csv_file_path, jsonl_file_path, locationId):
+    def import_bulk_data(self, csv_file_path, jsonl_file_path, locationId, resume=True, skip_unchanged=False, workers=None):
         print(f'Importing product from file {csv_file_path}')
-        # Create products
-        self.csv_to_jsonl(csv_file_path=csv_file_path, jsonl_file_path=jsonl_file_path, mode='product')
-        staged_target = self.generate_staged_target()
-        self.upload_jsonl(staged_target=staged_target, jsonl_path=jsonl_file_path)
-        self.create_products(staged_target=staged_target)
-        completed = False
-        while not completed:
-            time.sleep(3)
-            response = self.pool_operation_status()
-            if response['data']['currentBulkOperation']['status'] == 'COMPLETED':
-                completed = True
-
-        # Create variants
-        self.csv_to_jsonl(csv_file_path=csv_file_path, jsonl_file_path=jsonl_file_path, mode='variant', locationId=locationId)
-        staged_target = self.generate_staged_target()
-        self.upload_jsonl(staged_target=staged_target, jsonl_path=jsonl_file_path)
-        self.create_variants(staged_target=staged_target)
-        completed = False
-        while not completed:
-            time.sleep(3)
-            response = self.pool_operation_status()
-            if response['data']['currentBulkOperation']['status'] == 'COMPLETED':
-                completed = True
+        fingerprint = self._chunk_fingerprint(csv_file_path)
+        content_hashes, skip_handles = self._changed_products(csv_file_path, 'import') if skip_unchanged else ({}, set())
+        if skip_unchanged and len(skip_handles) == len(content_hashes):
+            print('No changed products to import')
+            return
+        failures = []
+        resumed = False
+        # The CSV is read and grouped once, by the first step that needs it
+        groups = None
+        # Create products, create variants, publish products
+        for phase in BULK_PIPELINE_PHASES['import']:
+            step = {
+                'chunk': os.path.splitext(os.path.basename(csv_file_path))[0],
+                'phase': phase,
+                'csv_file_path': csv_file_path,
+                'jsonl_file_path': jsonl_file_path,
+                'fingerprint': fingerprint,
+                'skip_handles': skip_handles,
+            }
+            if resume and self._resume_bulk_step(step):
+                print(f'Skipping {phase} step: already completed')
+                resumed = True
+                continue
+            if not step.get('bulk_operation_id'):
+                if groups is None:
+                    groups = self.load_product_groups(csv_file_path, skip_handles=skip_handles)
+                self._prepare_bulk_step(step, locationId=locationId, groups=groups, workers=workers)
+                step['bulk_operation_id'] = self._submit_bulk_step(step)
+            try:
+                operation = self.wait_for_bulk_operation(step['bulk_operation_id'], expected_count=self._count_lines(jsonl_file_path))
+            except BulkOperationError:
+                self._journal_step(step, 'failed')
+                raise
+            failures += self.ingest_bulk_mutation_result(operation, jsonl_file_path, report_path=self._bulk_report_path(jsonl_file_path, phase))
+            self._journal_step(step, 'completed')
 
-        # Publish product
-        self.csv_to_jsonl(csv_file_path=csv_file_path, jsonl_file_path=jsonl_file_path, mode='publish')
-        staged_target = self.generate_staged_target()
-        self.upload_jsonl(staged_target=staged_target, jsonl_path=jsonl_file_path)
-        self.publish_products(staged_target=staged_target)
-        completed = False
-        while not completed:
-            time.sleep(3)
-            response = self.pool_operation_status()
-            if response['data']['currentBulkOperation']['status'] == 'COMPLETED':
-                completed = True
+        # Failures of steps finished by an earlier run are unknown, so only a full run records hashes
+        if skip_unchanged and not resumed:
+            self._record_pushed_products(content_hashes, skip_handles, failures, 'import')
 
         print('Product import is completed')
 
+    # ================================== Bulk Pipeline ================================
+    def run_bulk_pipeline(self, chunk_directory, jsonl_directory=None, mode='import', locationId=None, max_retries=0, resume=True,
+                          skip_unchanged=False, workers=None):
+        """
+        Runs the bulk mutations for every chunk CSV in a directory (as written by
+        chunk_shopify_csv_by_product), preparing the next step while the current
+        bulk operation runs.
+
+        Only one bulk mutation can run per shop at a time, so the slot is the
+        bottleneck. JSONL generation, staged upload creation and upload for the next
+        ready step happen in a background thread, and that step is submitted as
+        soon as the slot frees up. A step waits for the previous phase of its own
+        chunk (variants and publications need the created product IDs), so chunks
+        interleave: while chunk N's variants are prepared, chunk N+1's products run.
+
+        Progress is recorded in the import journal, so with resume a rerun skips
+        completed steps and attaches to bulk operations that are still running.
+
+        Args:
+            chunk_directory (str): Directory containing the chunk CSV files.
+            jsonl_directory (str, optional): Where to write the JSONL files. Defaults to chunk_directory.
+            mode (str): 'import' (product, variant, publish) or 'update'.
+            locationId (str, optional): Location GID for variant inventory quantities.
+            max_retries (int): How many times to resubmit the failed lines of a step.
+            resume (bool): Continue from the import journal instead of starting over.
+            skip_unchanged (bool): Leave out products whose content hash matches the last successful push.
+            workers (int, optional): Processes used to write each step's JSONL (see product_groups_to_jsonl()).
+
+        Returns:
+            list: One dict per submitted step with chunk, phase, file paths, bulk_operation_id,
+                status and the number of lines that still failed.
+        """
+        csv_file_paths = sorted(glob(os.path.join(chunk_directory, '*.csv')) + glob(os.path.join(chunk_directory, '*.parquet')))
+        jsonl_directory = jsonl_directory or chunk_directory
+        os.makedirs(jsonl_directory, exist_ok=True)
+        print(f'Running bulk {mode} pipeline for {len(csv_file_paths)} chunks...')
+
+        phases = BULK_PIPELINE_PHASES[mode]
+        chunks = []
+        # Per chunk: content hashes, unchanged handles and failures across its steps
+        content_hashes = []
+        skip_handles = []
+        chunk_failures = []
+        for csv_file_path in csv_file_paths:
+            name = os.path.splitext(os.path.basename(csv_file_path))[0]
+            hashes, unchanged = self._changed_products(csv_file_path, mode) if skip_unchanged else ({}, set())
+            content_hashes.append(hashes)
+            skip_handles.append(unchanged)
+            chunk_failures.append([])
+            chunks.append([
+                {
+                    'chunk': name,
+                    'phase': phase,
+                    'csv_file_path': csv_file_path,
+                    'jsonl_file_path': os.path.join(jsonl_directory, f'{name}.{phase}.jsonl'),
+                    'fingerprint': self._chunk_fingerprint(csv_file_path),
+                    'skip_handles': unchanged,
+                }
+                for phase in phases
+            ])
+        # Per chunk: index of the next step to prepare and number of completed steps
+        prepared = [0] * len(chunks)
+        completed = [0] * len(chunks)
+        # Per chunk: rows read and grouped once for all its steps, dropped when the chunk is done
+        chunk_groups = [None] * len(chunks)
+        resumed = set()
+        if resume:
+            for i, steps in enumerate(chunks):
+                while completed[i] < len(steps) and self._journal_entry(steps[completed[i]], 'status') == 'completed':
+                    completed[i] += 1
+                    resumed.add(i)
+                prepared[i] = completed[i]
+            skipped = sum(completed)
+            if skipped:
+                print(f'Resuming: {skipped} steps already completed')
+        if skip_unchanged:
+            for i, steps in enumerate(chunks):
+                if len(skip_handles[i]) == len(content_hashes[i]):
+                    print(f"Skipping {steps[0]['chunk']}: no changed products")
+                    completed[i] = prepared[i] = len(steps)
+
+        def next_step():
+            # Earliest chunk whose previous phase has completed and whose next step is not yet prepared
+            for i, steps in enumerate(chunks):
+                if prepared[i] < len(steps) and prepared[i] == completed[i]:
+                    prepared[i] += 1
+                    return i, steps[prepared[i] - 1]
+            return None
+
+        def prepare(ready):
+            # Returns the error instead of raising it, so one chunk failing to prepare does not stop the others
+            i, step = ready
+            try:
+                if resume:
+                    self._resume_bulk_step(step)
+                if not step.get('bulk_operation_id'):
+                    if chunk_groups[i] is None:
+                        chunk_groups[i] = self.load_product_groups(step['csv_file_path'], skip_handles=step['skip_handles'])
+                    self._prepare_bulk_step(step, locationId=locationId, groups=chunk_groups[i], workers=workers)
+            except Exception as e:
+                return i, step, e
+            return i, step, None
+
+        results = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ready = next_step()
+            pending = executor.submit(prepare, ready) if ready else None
+            while pending is not None:
+                i, step, error = pending.result()
+                if error is not None:
+                    # An unresolved submission stays journaled as such until it is checked by hand
+                    if not isinstance(error, BulkSubmissionUnresolvedError):
+                        self._journal_step(step, 'failed')
+                    print(f"Error: preparing the {step['phase']} step of {step['chunk']} failed ({error}); skipping the rest of this chunk")
+                    prepared[i] = len(chunks[i])
+                    chunk_groups[i] = None
+                    step.pop('staged_target', None)
+                    results.append({**step, 'bulk_operation_id': None, 'status': 'NOT_STARTED', 'failed': 0})
+                    ready = next_step()
+                    pending = executor.submit(prepare, ready) if ready else None
+                    continue
+
+                try:
+                    bulk_operation_id = step.get('bulk_operation_id') or self._submit_bulk_step(step)
+                except BulkOperationError as e:
+                    bulk_operation_id = None
+                    operation = {'status': 'NOT_STARTED', 'errorCode': str(e)}
+
+                # Prepare the following step while this one runs
+                ready = next_step()
+                pending = executor.submit(prepare, ready) if ready else None
+
+                if bulk_operation_id:
+                    try:
+                        operation = self.wait_for_bulk_operation(bulk_operation_id, expected_count=self._count_lines(step['jsonl_file_path']))
+                    except BulkOperationError as e:
+                        operation = e.operation or {'status': 'TIMEOUT', 'errorCode': str(e)}
+
+                step.pop('staged_target', None)
+                failures = []
+                if operation['status'] == 'COMPLETED':
+                    failures = self.retry_bulk_failures(step['phase'], step['jsonl_file_path'], operation, max_retries=max_retries)
+                    self._journal_step(step, 'completed')
+                    completed[i] += 1
+                    chunk_failures[i] += failures
+                    # Failures of steps finished by an earlier run are unknown, so only fully run chunks record hashes
+                    if skip_unchanged and completed[i] == len(chunks[i]) and i not in resumed:
+                        self._record_pushed_products(content_hashes[i], skip_handles[i], chunk_failures[i], mode)
+                    if completed[i] == len(chunks[i]):
+                        chunk_groups[i] = None
+                else:
+                    self._journal_step(step, 'failed')
+                    # Later phases of this chunk depend on this one
+                    print(f"Error: {step['phase']} step of {step['chunk']} ended {operation['status']} ({operation.get('errorCode')}); skipping the rest of this chunk")
+                    prepared[i] = len(chunks[i])
+                    chunk_groups[i] = None
+                results.append({**step, 'bulk_operation_id': bulk_operation_id, 'status': operation['status'], 'failed': len(failures)})
+                step.pop('bulk_operation_id', None)
+
+                if pending is None:
+                    ready = next_step()
+                    pending = executor.submit(prepare, ready) if ready else None
+
+        failed = sum(result['status'] != 'COMPLETED' for result in results)
+        failed_lines = sum(result['failed'] for result in results)
+        print(f'Bulk {mode} pipeline finished: {len(results) - failed} steps completed, {failed} failed, {failed_lines} lines with errors')
+        return results
+
+    def _prepare_bulk_step(self, step, locationId=None, groups=None, workers=None):
+        """
+        Writes the JSONL of a pipeline step and uploads it to a new staged target.
+        groups are the chunk's rows from load_product_groups(), shared by the
+        steps of a chunk; they are loaded here when not given.
+        """
+        print(f"Preparing {step['phase']} step of {step['chunk']}...")
+        if groups is None:
+            groups = self.load_product_groups(step['csv_file_path'], skip_handles=step.get('skip_handles'))
+        if groups is None:
+            # Never upload whatever an earlier phase or run left at the JSONL path
+            raise ValueError(f"Could not read '{step['csv_file_path']}' for the {step['phase']} step of {step['chunk']}")
+        self.product_groups_to_jsonl(groups, step['jsonl_file_path'], mode=step['phase'], locationId=locationId, workers=workers)
+        step['staged_target'] = self.generate_staged_target()
+        self.upload_jsonl(staged_target=step['staged_target'], jsonl_path=step['jsonl_file_path'])
+        staged_upload_path = step['staged_target']['data']['stagedUploadsCreate']['stagedTargets'][0]['parameters'][3]['value']
+        self._journal_step(step, 'prepared', staged_upload_path=staged_upload_path)
+        return step
+
+    def _submit_bulk_step(self, step):
+        """
+        Submits the bulk mutation of a prepared pipeline step and returns its
+        operation ID. If another bulk mutation still holds the shop's slot, waits
+        for it to finish and submits again.
+        """
+        submit = getattr(self, BULK_PHASE_MUTATIONS[step['phase']])
+        self._journal_step(step, 'submitting')
+        while True:
+            response = submit(staged_target=step['staged_target'])
+            try:
+                bulk_operation_id = self._bulk_operation_id(response)
+                break
+            except BulkOperationError as e:
+                if 'already in progress' not in str(e):
+                    raise
+                current = self.pool_operation_status()['data']['currentBulkOperation']
+                if not current or current['status'] not in ('CREATED', 'RUNNING', 'CANCELING'):
+                    raise
+            try:
+                self.wait_for_bulk_operation(current['id'])
+            except BulkOperationError:
+                # Its outcome does not matter here, only that the slot is free again
+                pass
+        self._journal_step(step, 'submitted', bulk_operation_id=bulk_operation_id)
+        return bulk_operation_id
+
+    def _get_import_journal(self):
+        if self.import_journal is None:
+            self.import_journal = ImportJournal(path=f'.{self.store_name}.import_journal.sqlite')
+        return self.import_journal
+
+    @staticmethod
+    def _chunk_fingerprint(csv_file_path):
+        # A chunk CSV that was rewritten since it was journaled is imported afresh
+        stat = os.stat(csv_file_path)
+        return f'{stat.st_size}-{stat.st_mtime_ns}'
+
+    def _journal_entry(self, step, key=None):
+        entry = self._get_import_journal().get(os.path.abspath(step['csv_file_path']), step['fingerprint'], step['phase'])
+        if entry is None or key is None:
+            return entry
+        return entry[key]
+
+    def _journal_step(self, step, status, staged_upload_path=None, bulk_operation_id=None):
+        # Retry submissions are not pipeline steps and are not journaled
+        if 'fingerprint' not in step:
+            return
+        self._get_import_journal().record(
+            os.path.abspath(step['csv_file_path']), step['fingerprint'], step['phase'], status,
+            staged_upload_path=staged_upload_path, bulk_operation_id=bulk_operation_id
+        )
+
+    def _resume_bulk_step(self, step):
+        """
+        Looks a step up in the import journal. Returns True if it already completed.
+        If its bulk operation was already started, sets step['bulk_operation_id'] so
+        the caller attaches to it instead of submitting the step again.
+
+        Raises:
+            BulkSubmissionUnresolvedError: A create step was interrupted while being
+                submitted and no bulk operation matches it, so resubmitting it could
+                create duplicates.
+        """
+        entry = self._journal_entry(step)
+        if entry is None:
+            return False
+        if entry['status'] == 'completed':
+            return True
+        if entry['status'] == 'submitted':
+            step['bulk_operation_id'] = entry['bulk_operation_id']
+        elif entry['status'] == 'submitting':
+            # The process may have died after Shopify accepted the mutation but before its ID was recorded
+            response = self.pool_operation_status()
+            current = response['data']['currentBulkOperation'] if response else None
+            submitted_after = datetime.strptime(entry['updated_at'], '%Y-%m-%dT%H:%M:%SZ') - timedelta(seconds=BULK_RESUME_CLOCK_SKEW)
+            if (current and datetime.strptime(current['createdAt'], '%Y-%m-%dT%H:%M:%SZ') >= submitted_after
+                    and not self._get_import_journal().has_operation(current['id'])):
+                step['bulk_operation_id'] = current['id']
+                self._journal_step(step, 'submitted', bulk_operation_id=current['id'])
+            elif step['phase'] in BULK_CREATE_PHASES:
+                raise BulkSubmissionUnresolvedError(
+                    f"The {step['phase']} step of {step['chunk']} was interrupted while being submitted at "
+                    f"{entry['updated_at']} and no bulk operation matches it; check the Shopify admin, then "
+                    f"record the step as completed or failed in the import journal"
+                )
+        if step.get('bulk_operation_id'):
+            print(f"Resuming {step['phase']} step of {step['chunk']}: attaching to {step['bulk_operation_id']}")
+        return False
+
     # ================================== Webhook Subscription ================================
-    def webhook_subscription(self):
+    def webhook_subscription(self, callback_url="https://12345.ngrok.io/"):
         print("Subscribing webhook...")
         mutation = '''
-                    mutation {
+                    mutation ($callbackUrl: URL!) {
                         webhookSubscriptionCreate(
                             topic: BULK_OPERATIONS_FINISH
                             webhookSubscription: {
                                 format: JSON,
-                                callbackUrl: "https://12345.ngrok.io/"
+                                callbackUrl: $callbackUrl
                                 }
                         )
                         {
@@ -855,7 +2875,11 @@ class ShopifyApp:
                     }
         '''
 
-        return self.send_request(query=mutation)
+        variables = {
+            'callbackUrl': callback_url
+        }
+
+        return self.send_request(query=mutation, variables=variables)
 
     # ================================== Upload JSONL ================================
     def upload_jsonl(self, staged_target, jsonl_path):
@@ -865,7 +2889,12 @@ class ShopifyApp:
         files = dict()
         for parameter in parameters:
             files[f"{parameter['name']}"] = (None, parameter['value'])
-        files['file'] = open(jsonl_path, 'rb')
+        if str(jsonl_path).lower().endswith(('.gz', '.zst')):
+            # Shopify takes plain JSONL, so compressed files are uploaded decompressed
+            with _open_jsonl(jsonl_path) as f:
+                files['file'] = (os.path.basename(os.path.splitext(jsonl_path)[0]), f.read())
+        else:
+            files['file'] = open(jsonl_path, 'rb')
 
         # with httpx.Client(timeout=None, follow_redirects=True) as sess:
         response = httpx.post(url, files=files)
@@ -945,7 +2974,7 @@ class ShopifyApp:
         self.send_request(query=query)
 
     # ============================= get_products_media_by_handle ==========================
-    def get_products_media_by_handle(self, handles):
+    async def get_products_media_by_handle_async(self, handles):
         print('Getting product media...')
         f_handles = ','.join(handles)
         query = '''
@@ -998,10 +3027,20 @@ class ShopifyApp:
         '''
         variables = {'query': "handle:{}".format(f_handles)}
 
-        return self.send_request(query=query, variables=variables)
+        return await self.send_request_async(query=query, variables=variables)
 
-    def get_products_id_by_handle(self, handles):
+    def get_products_media_by_handle(self, handles):
+        return self._run(self.get_products_media_by_handle_async(handles=handles))
+
+    async def get_products_id_by_handle_async(self, handles):
         print('Getting product id...')
+        local_edges = []
+        if self.catalog is not None:
+            local = self.catalog.products_by_handle(handles)
+            local_edges = [{'node': {'handle': product['handle'], 'id': product['id']}} for product in local.values()]
+            handles = [handle for handle in handles if handle not in local]
+            if not handles:
+                return {'data': {'products': {'edges': local_edges, 'pageInfo': {'endCursor': None, 'hasNextPage': False}}}}
         f_handles = ','.join(handles)
         query = '''
             query(
@@ -1024,12 +3063,104 @@ class ShopifyApp:
         '''
         variables = {'query': "handle:{}".format(f_handles)}
 
-        return self.send_request(query=query, variables=variables)
+        response = await self.send_request_async(query=query, variables=variables)
+        if response and local_edges:
+            response['data']['products']['edges'] = local_edges + response['data']['products']['edges']
+        return response
+
+    def get_products_id_by_handle(self, handles):
+        return self._run(self.get_products_id_by_handle_async(handles=handles))
+
+    # ============================= resolve_product_ids ==========================
+    def _get_handle_cache(self):
+        if self.handle_cache is None:
+            self.handle_cache = HandleCache(path=f'.{self.store_name}.handle_cache.sqlite')
+        return self.handle_cache
+
+    def _cache_product_ids(self, products):
+        self._get_handle_cache().put_many({product['handle']: product['id'] for product in products if product.get('handle') and product.get('id')})
+
+    def _cache_products(self, products, batch_size=250, catalog=True):
+        """
+        Passes product nodes through while recording their handle -> id pairs
+        in the handle cache (and the nodes in the catalog, if set and catalog is
+        True), batch_size products at a time. Projected nodes lack fields and are
+        kept out of the catalog.
+        """
+        batch = []
+        for product in products:
+            batch.append(product)
+            if len(batch) >= batch_size:
+                self._store_products(batch, catalog=catalog)
+                batch = []
+            yield product
+        self._store_products(batch, catalog=catalog)
+
+    def _store_products(self, products, catalog=True):
+        self._cache_product_ids(products)
+        if catalog and self.catalog is not None:
+            self.catalog.put_products(products)
+
+    async def resolve_product_ids_async(self, handles, chunk_size=100, refresh=False):
+        """
+        Async version of resolve_product_ids().
+        """
+        handles = [handle for handle in dict.fromkeys(handles) if handle]
+        product_ids = {} if refresh else self._get_handle_cache().get_many(handles)
+        missing = [handle for handle in handles if handle not in product_ids]
+        print(f'Resolving product ids: {len(product_ids)} cached, {len(missing)} to look up...')
+
+        if missing:
+            responses = await self.gather_bounded([
+                self.get_products_id_by_handle_async(handles=chunk) for chunk in self.chunk_list(missing, chunk_size=chunk_size)
+            ])
+            fetched = {}
+            for response in responses:
+                if not response:
+                    continue
+                for edge in response['data']['products']['edges']:
+                    fetched[edge['node']['handle']] = edge['node']['id']
+            self._get_handle_cache().put_many(fetched)
+            product_ids.update(fetched)
+
+        return {handle: product_ids[handle] for handle in handles if handle in product_ids}
+
+    def resolve_product_ids(self, handles, chunk_size=100, refresh=False):
+        """
+        Resolves product handles to product GIDs. Handles found in the local
+        handle cache are answered from it; the rest are looked up in chunks of
+        chunk_size handles, concurrently, and added to the cache.
+
+        Args:
+            handles (list): Product handles.
+            chunk_size (int): Number of handles per products query (max 250).
+            refresh (bool): Ignore the cache and look every handle up again.
+
+        Returns:
+            dict: handle -> product GID for the handles that exist in the shop.
+        """
+        return self._run(self.resolve_product_ids_async(handles=handles, chunk_size=chunk_size, refresh=refresh))
+
+    def _product_id_frame(self, handles):
+        """
+        Returns the resolved product ids as a DataFrame with handle and id columns.
+        """
+        product_ids = self.resolve_product_ids(handles=handles)
+        return pd.DataFrame({'handle': list(product_ids.keys()), 'id': list(product_ids.values())})
 
     # ============================= get_products_with_pagination =======================
     def get_products_with_pagination(self, variable_query, after=None):
         print('Getting products...')
-        query = '''
+        query = self._products_with_pagination_query()
+
+        variables = variable_query
+        if after:
+            variables['after'] = after
+
+        return self.send_request(query=query, variables=variables)
+
+    def _products_with_pagination_query(self):
+        return '''
             query(
                 $query: String,
                 $after: String
@@ -1056,13 +3187,71 @@ class ShopifyApp:
             }
         '''
 
-        variables = variable_query
-        if after:
-            variables['after'] = after
+    def iter_products_with_pagination(self, variable_query):
+        """
+        Lazily yields the product nodes of get_products_with_pagination(),
+        following the cursor page by page.
 
-        return self.send_request(query=query, variables=variables)
+        Args:
+            variable_query (dict): Query variables, e.g. {'query': "created_at:>'2025-08-15T04:24:54Z'"}
+        """
+        return self.paginate(query=self._products_with_pagination_query(), connection_path='products', variables=variable_query)
+
+    def _catalog_product_variants_response(self, variable_query):
+        """
+        Answers a single sku: products query from the catalog mirror, in the
+        response shape of get_product_variants_by_sku(). Returns None when the
+        query is not a single sku: term or the mirror does not hold the SKU.
+        """
+        match = re.fullmatch(r'\s*sku:(?:"((?:[^"\\]|\\.)*)"|([^\s"]+))\s*', (variable_query or {}).get('query') or '')
+        if match is None:
+            return None
+        sku = re.sub(r'\\(.)', r'\1', match.group(1)) if match.group(1) is not None else match.group(2)
+        variant = self.catalog.variants_by_sku([sku]).get(sku)
+        if variant is None:
+            return None
+        product = self.catalog.products_by_id([variant['product_id']]).get(variant['product_id'])
+        if product is None:
+            return None
 
-    def get_product_variants_by_sku(self, variable_query, after=None):
+        variants = []
+        for node in CatalogStore._nodes(product.get('variants'))[:20]:
+            variants.append({
+                'compareAtPrice': node.get('compareAtPrice'),
+                'displayName': node.get('displayName'),
+                'inventoryItem': {'sku': node.get('sku')},
+                'inventoryQuantity': node.get('inventoryQuantity'),
+                'price': node.get('price'),
+            })
+        return {'data': {'products': {
+            'edges': [{'node': {
+                'handle': product.get('handle'),
+                'id': product.get('id'),
+                'title': product.get('title'),
+                'description': product.get('description'),
+                'variants': {'nodes': variants},
+            }}],
+            'pageInfo': {'endCursor': None, 'hasNextPage': False},
+        }}}
+
+    def get_product_variants_by_sku(self, variable_query, after=None, use_catalog=False):
+        """
+        Gets up to 3 products matching a products search query, with their variants.
+
+        Args:
+            variable_query (dict): Query variables, e.g. {'query': 'sku:ABC-123'}.
+            use_catalog (bool): Answer a single sku: query from the catalog mirror
+                when it holds the SKU; only the product owning that exact SKU is
+                returned. Off by default because prices and stock there are only
+                as fresh as the last sync.
+
+        Returns:
+            dict: The products query response.
+        """
+        if use_catalog and self.catalog is not None:
+            response = self._catalog_product_variants_response(variable_query)
+            if response is not None:
+                return response
         print('Getting products...')
         query = '''
             query(
@@ -1102,31 +3291,124 @@ class ShopifyApp:
 
         return self.send_request(query=query, variables=variables)
 
-    def get_products_with_filter(self, filters=None, after=None, first=250):
+    # ============================= get_variants_by_sku ==========================
+    @staticmethod
+    def _search_term(name, value):
+        # Quoted so SKUs with spaces, colons or dashes match as a whole
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        return f'{name}:"{escaped}"'
+
+    def _sku_batches(self, skus, max_query_length=4000, max_batch_size=100):
         """
-        Fetches products with flexible filtering options.
-        
+        Packs sku: search terms into OR-ed query strings no longer than
+        max_query_length and with at most max_batch_size terms each.
+        """
+        batches = []
+        batch = []
+        length = 0
+        for sku in skus:
+            term_length = len(self._search_term('sku', sku)) + len(' OR ')
+            if batch and (length + term_length > max_query_length or len(batch) >= max_batch_size):
+                batches.append(batch)
+                batch = []
+                length = 0
+            batch.append(sku)
+            length += term_length
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _get_variants_for_skus_async(self, skus):
+        query = '''
+            query($query: String, $after: String, $first: Int) {
+                productVariants(first: $first, query: $query, after: $after) {
+                    nodes {
+                        id
+                        sku
+                        barcode
+                        price
+                        compareAtPrice
+                        inventoryQuantity
+                        product {
+                            id
+                            handle
+                        }
+                    }
+                    pageInfo {
+                        endCursor
+                        hasNextPage
+                    }
+                }
+            }
+        '''
+        variables = {
+            'query': ' OR '.join(self._search_term('sku', sku) for sku in skus),
+            # Requested cost scales with first, so ask for about one variant per SKU;
+            # duplicate SKUs spill over into further pages
+            'first': min(250, len(skus) + 10)
+        }
+        return [node async for node in self.paginate_async(query=query, connection_path='productVariants', variables=variables)]
+
+    async def get_variants_by_sku_async(self, skus, use_catalog=False, max_query_length=4000, max_batch_size=100):
+        """
+        Async version of get_variants_by_sku().
+        """
+        skus = [str(sku) for sku in dict.fromkeys(skus) if sku is not None and str(sku) != '']
+        variants = {}
+        if use_catalog and self.catalog is not None:
+            variants.update(self.catalog.variants_by_sku(skus))
+
+        missing = [sku for sku in skus if sku not in variants]
+        batches = self._sku_batches(missing, max_query_length=max_query_length, max_batch_size=max_batch_size)
+        print(f'Looking up {len(missing)} SKUs in {len(batches)} batches...')
+        results = await self.gather_bounded([self._get_variants_for_skus_async(batch) for batch in batches])
+
+        wanted = set(missing)
+        for nodes in results:
+            for node in nodes:
+                # sku: search also matches on tokens, keep exact matches only
+                if node.get('sku') in wanted:
+                    variants[node['sku']] = {
+                        'id': node['id'],
+                        'product_id': node['product']['id'],
+                        'handle': node['product']['handle'],
+                        'sku': node['sku'],
+                        'barcode': node['barcode'],
+                        'price': node['price'],
+                        'compareAtPrice': node['compareAtPrice'],
+                        'inventoryQuantity': node['inventoryQuantity'],
+                    }
+
+        misses = [sku for sku in skus if sku not in variants]
+        print(f'SKU lookup: {len(skus) - len(misses)} found, {len(misses)} missing')
+        if misses:
+            print(f"Missing SKUs: {', '.join(misses[:20])}{' ...' if len(misses) > 20 else ''}")
+        return {sku: variants[sku] for sku in skus if sku in variants}
+
+    def get_variants_by_sku(self, skus, use_catalog=False, max_query_length=4000, max_batch_size=100):
+        """
+        Resolves many SKUs at once. SKUs are packed into OR-ed sku: queries on
+        productVariants, bounded by query length and batch size (which bounds
+        the requested cost), and the batches run concurrently.
+
         Args:
-            filters (dict): Filter options:
-                - 'handle': Single handle or list of handles
-                - 'title': Product title search
-                - 'vendor': Vendor name
-                - 'product_type': Product type
-                - 'tag': Tag name(s)
-                - 'created_at': Date range (e.g., ">2025-08-15T00:00:00Z" or ":'2025-08-01T00:00:00Z'..'2025-08-31T23:59:59Z'")
-                - 'updated_at': Date range
-                - 'status': ACTIVE, DRAFT, ARCHIVED
-                - 'has_only_default_variant': true/false
-                - 'published_status': published, unpublished, any
-                - 'inventory_total': For available products - use ">0" for in stock
-            after (str): Pagination cursor
-            first (int): Number of products per page (max 250)
-            
+            skus (list): SKUs to look up.
+            use_catalog (bool): Answer from the catalog mirror first. Off by default
+                because prices and stock there are only as fresh as the last sync.
+            max_query_length (int): Longest search query string per batch.
+            max_batch_size (int): Most SKUs per batch.
+
         Returns:
-            dict: GraphQL response with products
+            dict: SKU -> {id, product_id, handle, sku, barcode, price, compareAtPrice, inventoryQuantity}.
+                SKUs that were not found are missing from the dict and reported.
+        """
+        return self._run(self.get_variants_by_sku_async(skus, use_catalog=use_catalog, max_query_length=max_query_length, max_batch_size=max_batch_size))
+
+    def _build_products_filter_query(self, filters=None):
+        """
+        Builds the products search query string from the filters accepted by
+        get_products_with_filter().
         """
-        print('Getting products with filters...')
-        
         # Build query string from filters
         query_parts = []
         if filters:
@@ -1175,65 +3457,741 @@ class ShopifyApp:
         
         # Join all query parts with AND
         query_string = ' AND '.join(query_parts) if query_parts else ''
+
+        return query_string
+
+    def _product_projection(self, fields=None):
+        """
+        Resolves the fields requested from the product readers into the product
+        and variant fields to select. Product fields are named as in
+        PRODUCT_FIELD_SELECTIONS, variant fields as 'variants.<field>' (or
+        'variants' for all of them). id and handle, and the variant id when any
+        variant field is requested, are always selected. None selects everything.
+
+        Returns:
+            tuple: (product fields, variant fields)
+        """
+        if fields is None:
+            return list(PRODUCT_FIELD_SELECTIONS), list(VARIANT_FIELD_SELECTIONS)
+
+        product_fields = {'id', 'handle'}
+        variant_fields = set()
+        unknown = []
+        for name in fields:
+            if name == 'variants':
+                variant_fields.update(VARIANT_FIELD_SELECTIONS)
+            elif name.startswith('variants.') and name[len('variants.'):] in VARIANT_FIELD_SELECTIONS:
+                variant_fields.add(name[len('variants.'):])
+            elif name in PRODUCT_FIELD_SELECTIONS:
+                product_fields.add(name)
+            else:
+                unknown.append(name)
+        if unknown:
+            raise KeyError(f"Unknown product field(s) {unknown}")
+        if variant_fields:
+            variant_fields.add('id')
+
+        return (
+            [name for name in PRODUCT_FIELD_SELECTIONS if name in product_fields],
+            [name for name in VARIANT_FIELD_SELECTIONS if name in variant_fields]
+        )
+
+    def _unprojected_columns(self, fields=None):
+        """
+        Returns the PRODUCT_CSV_COLUMNS read from fields left out of the projection.
+        """
+        if fields is None:
+            return []
+        product_fields, variant_fields = self._product_projection(fields)
+        selected = set(product_fields) | {f'variants.{name}' for name in variant_fields}
+        return [column for column, source in PRODUCT_CSV_FIELD_SOURCES.items() if source not in selected]
+
+    def _variant_selection(self, fields=None):
+        if fields is None:
+            fields = list(VARIANT_FIELD_SELECTIONS)
+        return '\n'.join(VARIANT_FIELD_SELECTIONS[name] for name in fields)
+
+    def _product_selection(self, bulk=False, media=False, fields=None):
+        """
+        Returns the product fields selected by get_products_with_filter(), or
+        only the requested ones (see _product_projection()). Bulk queries ignore
+        page sizes, so the variants connection is selected in full there.
+        Otherwise the first $variantsFirst variants are selected with their
+        pageInfo, and _complete_variants() fetches the rest. With media, product
+        media is selected too.
+        """
+        product_fields, variant_fields = self._product_projection(fields)
+        variant_selection = self._variant_selection(variant_fields)
+        media_fields = '''
+                                    id
+                                    alt
+                                    preview {
+                                        image {
+                                            url
+                                        }
+                                    }
+        '''
+        connections = ''
+        if bulk:
+            if variant_fields:
+                connections = 'variants { edges { node {%s} } }' % variant_selection
+            if media:
+                connections += ' media { edges { node {%s} } }' % media_fields
+        else:
+            if variant_fields:
+                connections = 'variants(first: $variantsFirst) { nodes {%s} pageInfo { hasNextPage endCursor } }' % variant_selection
+            if media:
+                connections += ' media(first: 50) { nodes {%s} }' % media_fields
+
+        return '\n'.join([PRODUCT_FIELD_SELECTIONS[name] for name in product_fields] + [connections])
+
+    def _products_with_filter_query(self, media=False, fields=None, sort_key=None):
+        variables = '$query: String, $after: String, $first: Int'
+        if self._product_projection(fields)[1]:
+            variables += ', $variantsFirst: Int'
+        sort = f', sortKey: {sort_key}' if sort_key else ''
+        return '''
+            query(%s)
+            {
+                products(first: $first, query: $query, after: $after%s) {
+                    edges {
+                        node {%s}
+                    }
+                    pageInfo {
+                        endCursor
+                        hasNextPage
+                    }
+                }
+            }
+        ''' % (variables, sort, self._product_selection(media=media, fields=fields))
+
+    async def get_products_with_filter_async(self, filters=None, after=None, first=10, variants_first=20, fields=None):
+        """
+        Fetches products with flexible filtering options.
+        
+        Args:
+            filters (dict): Filter options:
+                - 'handle': Single handle or list of handles
+                - 'title': Product title search
+                - 'vendor': Vendor name
+                - 'product_type': Product type
+                - 'tag': Tag name(s)
+                - 'created_at': Date range (e.g., ">2025-08-15T00:00:00Z" or ":'2025-08-01T00:00:00Z'..'2025-08-31T23:59:59Z'")
+                - 'updated_at': Date range
+                - 'status': ACTIVE, DRAFT, ARCHIVED
+                - 'has_only_default_variant': true/false
+                - 'published_status': published, unpublished, any
+                - 'inventory_total': For available products - use ">0" for in stock
+            after (str): Pagination cursor
+            first (int): Number of products per page (max 250). A page whose query
+                cost exceeds MAX_QUERY_COST is shrunk until it fits.
+            variants_first (int): Variants selected per product in the page query
+            fields (list): Product fields to select, e.g. ['tags', 'variants.sku'].
+                See _product_projection(); None selects every field.
+            
+        Returns:
+            dict: GraphQL response with products
+        """
+        print('Getting products with filters...')
+
+        query = self._products_with_filter_query(fields=fields)
+        query_string = self._build_products_filter_query(filters)
+        
+        variables = {
+            'query': query_string,
+            'first': first
+        }
+        if self._product_projection(fields)[1]:
+            variables['variantsFirst'] = variants_first
+        
+        if after:
+            variables['after'] = after
+        
+        response, _ = await self._request_page_async(query=query, variables=variables)
+        if response:
+            await self._complete_variants_async([edge['node'] for edge in response['data']['products']['edges']], fields=fields)
+        return response
+
+    def get_products_with_filter(self, filters=None, after=None, first=10, variants_first=20, fields=None):
+        return self._run(self.get_products_with_filter_async(filters=filters, after=after, first=first, variants_first=variants_first, fields=fields))
+
+    async def _complete_variants_async(self, products, fields=None):
+        """
+        Fetches the remaining variants of products whose variants connection
+        was cut at $variantsFirst and drops the pageInfo, so every product node
+        carries all of its variants.
+        """
+        query = '''
+            query($id: ID!, $after: String, $first: Int) {
+                product(id: $id) {
+                    variants(first: $first, after: $after) {
+                        nodes {%s}
+                        pageInfo {
+                            hasNextPage
+                            endCursor
+                        }
+                    }
+                }
+            }
+        ''' % self._variant_selection(self._product_projection(fields)[1])
+
+        async def fetch_rest(product):
+            variants = product['variants']
+            variables = {
+                'id': product['id'],
+                'first': 250,
+                'after': variants['pageInfo']['endCursor']
+            }
+            variants['nodes'] += [node async for node in self.paginate_async(query=query, connection_path='product.variants', variables=variables)]
+
+        truncated = [product for product in products if ((product.get('variants') or {}).get('pageInfo') or {}).get('hasNextPage')]
+        if truncated:
+            print(f'Fetching remaining variants of {len(truncated)} products...')
+            await self.gather_bounded([fetch_rest(product) for product in truncated])
+        for product in products:
+            (product.get('variants') or {}).pop('pageInfo', None)
+
+    def _complete_variants(self, products, batch_size=50, fields=None):
+        """
+        Passes product nodes through _complete_variants_async(), batch_size at a time.
+        """
+        batch = []
+        for product in products:
+            batch.append(product)
+            if len(batch) >= batch_size:
+                self._run(self._complete_variants_async(batch, fields=fields))
+                yield from batch
+                batch = []
+        self._run(self._complete_variants_async(batch, fields=fields))
+        yield from batch
+
+    def fetch_all_products_with_filter(self, filters=None, first=250, fields=None):
+        """
+        Fetches all products matching the filter criteria with automatic pagination.
+        Returns a pandas DataFrame with all headers needed for csv_to_jsonl function.
         
+        Args:
+            filters (dict): Same filter options as get_products_with_filter()
+            first (int): Number of products per page (max 250)
+            fields (list): Only select these product fields (see get_products_with_filter()).
+                Columns read from other fields are left empty.
+            
+        Returns:
+            pd.DataFrame: DataFrame with all columns required by csv_to_jsonl():
+                - Handle, Title, Body (HTML), Vendor, Product Category, Type, Tags, Published
+                - Status, Gift Card, SEO Title, SEO Description
+                - Option1/2/3 Name, Value, Linked To
+                - Variant SKU, Grams, Inventory Tracker, Policy, Fulfillment Service
+                - Variant Price, Compare At Price, Requires Shipping, Taxable, Barcode
+                - Variant Image, Weight Unit, Cost per item
+                - Image Src, Position, Alt Text
+                - Available Qty
+                - Vendor SKU, enable_best_price, arrives_before_christmas metafields
+        
+        Example:
+            # Fetch all in-stock products and convert to JSONL
+            df = app.fetch_all_products_with_filter({'inventory_total': '>0'})
+            app.csv_to_jsonl_from_dataframe(df, 'data/products.jsonl', mode='product')
+
+            # Only pay for the tags and SKUs
+            df = app.fetch_all_products_with_filter(fields=['tags', 'variants.sku'])
+        """
+        print(f'Fetching all products with filters: {filters}...')
+
+        return self._products_to_dataframe(self.iter_products_with_filter(filters=filters, first=first, fields=fields), fields=fields)
+
+    def iter_products_with_filter(self, filters=None, first=250, media=False, variants_first=20, fields=None, sort_key=None,
+                                  strict=False):
+        """
+        Lazily yields product nodes matching the filter criteria, page by page.
+        The next page is requested while the current one is being consumed.
+
+        The page size starts small and adapts to the observed query cost, up to
+        first. Variants are selected variants_first at a time; products with more
+        get their remaining variants in a nested pagination pass.
+
+        Args:
+            filters (dict): Same filter options as get_products_with_filter()
+            first (int): Largest number of products per page (max 250)
+            media (bool): Also select product media (first 50)
+            variants_first (int): Variants selected per product in the page query
+            fields (list): Only select these product fields (see get_products_with_filter())
+            sort_key (str, optional): ProductSortKeys value to list the products by, e.g. 'UPDATED_AT'.
+            strict (bool): Raise PaginationError if a page fails instead of stopping early.
+        """
+        variables = {
+            'query': self._build_products_filter_query(filters),
+            'first': min(first, 10)
+        }
+        if self._product_projection(fields)[1]:
+            variables['variantsFirst'] = variants_first
+
+        query = self._products_with_filter_query(media=media, fields=fields, sort_key=sort_key)
+        products = self.paginate(query=query, connection_path='products', variables=variables, max_first=first, strict=strict)
+        return self._cache_products(self._complete_variants(products, fields=fields), catalog=fields is None)
+
+    def _products_frame(self, products):
+        """
+        Converts product nodes from get_products_with_filter() into the
+        fetch_all_products_with_filter() table, one row per variant (or a single
+        row for a product without variants). Values are collected column by
+        column; product columns are repeated over their variant rows and
+        constant columns are broadcast by pandas.
+
+        Returns:
+            tuple: (DataFrame with PRODUCT_CSV_COLUMNS, number of products)
+        """
+        product_columns = {column: [] for column in [
+            'ID', 'Handle', 'Title', 'Body (HTML)', 'Vendor', 'Type', 'Tags', 'Status', 'Gift Card', 'SEO Title', 'SEO Description', 'Vendor SKU',
+            'enable_best_price (product.metafields.custom.enable_best_price)',
+            'arrives_before_christmas (product.metafields.custom.arrives_before_christmas)',
+            'info_meta_text (product.metafields.custom.info_meta_text)',
+        ]}
+        variant_columns = {column: [] for column in [
+            'Variant SKU', 'Variant Grams', 'Variant Inventory Tracker', 'Variant Price', 'Variant Compare At Price',
+            'Variant Barcode', 'Variant Weight Unit', 'Available Qty',
+        ]}
+        row_counts = []
+        # Map Shopify weight units
+        unit_map = {'KILOGRAMS': 'kg', 'GRAMS': 'g', 'POUNDS': 'lb', 'OUNCES': 'oz'}
+
+        def metafield_value(product, key):
+            # The GraphQL response returns each metafield as a single object (or None)
+            metafield_obj = product.get(f'metafield_{key}')
+            if metafield_obj and isinstance(metafield_obj, dict):
+                return metafield_obj.get('value', '')
+            return ''
+
+        for product in products:
+            product_columns['ID'].append(product.get('id', ''))
+            product_columns['Handle'].append(product.get('handle', ''))
+            product_columns['Title'].append(product.get('title', ''))
+            product_columns['Body (HTML)'].append(product.get('descriptionHtml') or '')
+            product_columns['Vendor'].append(product.get('vendor', ''))
+            product_columns['Type'].append(product.get('productType', ''))
+            product_columns['Tags'].append(','.join(product.get('tags', [])) if product.get('tags') else '')
+            product_columns['Status'].append(product.get('status', 'ACTIVE'))
+            product_columns['Gift Card'].append('true' if product.get('isGiftCard', False) else 'false')
+            seo = product.get('seo') or {}
+            product_columns['SEO Title'].append(seo.get('title') or '')
+            product_columns['SEO Description'].append(seo.get('description') or '')
+            product_columns['Vendor SKU'].append(metafield_value(product, 'vendor_sku'))
+            product_columns['enable_best_price (product.metafields.custom.enable_best_price)'].append(metafield_value(product, 'enable_best_price'))
+            product_columns['arrives_before_christmas (product.metafields.custom.arrives_before_christmas)'].append(metafield_value(product, 'arrives_before_christmas'))
+            product_columns['info_meta_text (product.metafields.custom.info_meta_text)'].append(metafield_value(product, 'info_meta_text'))
+
+            variants = product.get('variants', {}).get('nodes', [])
+
+            # A product without variants still gets a single row
+            if not variants:
+                row_counts.append(1)
+                variant_columns['Variant SKU'].append('')
+                variant_columns['Variant Grams'].append('')
+                variant_columns['Variant Inventory Tracker'].append('shopify')
+                variant_columns['Variant Price'].append('')
+                variant_columns['Variant Compare At Price'].append('')
+                variant_columns['Variant Barcode'].append('')
+                variant_columns['Variant Weight Unit'].append('g')
+                variant_columns['Available Qty'].append('')
+                continue
+
+            row_counts.append(len(variants))
+            for variant in variants:
+                # Extract weight information from inventoryItem
+                variant_grams = ''
+                variant_weight_unit = 'g'
+                variant_tracked = False
+
+                inventory_item = variant.get('inventoryItem', {})
+                if inventory_item and isinstance(inventory_item, dict):
+                    weight_obj = inventory_item.get('weight', {})
+                    if weight_obj and isinstance(weight_obj, dict):
+                        variant_grams = str(weight_obj.get('value', ''))
+                        variant_weight_unit = unit_map.get(weight_obj.get('unit', 'GRAMS'), 'g')
+                    # detect whether this variant is inventory-tracked
+                    variant_tracked = bool(inventory_item.get('tracked', False))
+
+                variant_columns['Variant SKU'].append(variant.get('sku', ''))
+                variant_columns['Variant Grams'].append(variant_grams)
+                variant_columns['Variant Inventory Tracker'].append('shopify' if variant_tracked else '')
+                variant_columns['Variant Price'].append(str(variant.get('price', '')))
+                variant_columns['Variant Compare At Price'].append(str(variant.get('compareAtPrice', '')) if variant.get('compareAtPrice') else '')
+                variant_columns['Variant Barcode'].append(variant.get('barcode', ''))
+                variant_columns['Variant Weight Unit'].append(variant_weight_unit)
+                variant_columns['Available Qty'].append(str(variant.get('inventoryQuantity', '')))
+
+        row_counts = np.array(row_counts, dtype=np.int64)
+        columns = {
+            'Product Category': 'gid://shopify/TaxonomyCategory/tg-5-20-1',  # Default category
+            'Published': 'true',  # Default to published; adjust if needed
+            'Variant Inventory Policy': 'deny',
+            'Variant Fulfillment Service': 'manual',
+            'Variant Requires Shipping': 'true',
+            'Variant Taxable': 'true',
+        }
+        for column, values in product_columns.items():
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            columns[column] = np.repeat(array, row_counts)
+        for column, values in variant_columns.items():
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            columns[column] = array
+
+        df = pd.DataFrame(columns, index=pd.RangeIndex(int(row_counts.sum())))
+        # Option, image and cost columns are not read from the API
+        for column in PRODUCT_CSV_COLUMNS:
+            if column not in df.columns:
+                df[column] = ''
+
+        return df[PRODUCT_CSV_COLUMNS], len(row_counts)
+
+    def export_products_with_filter(self, csv_file_path, filters=None, first=250, fields=None):
+        """
+        Streams all products matching the filter criteria into a CSV file with the
+        same layout as fetch_all_products_with_filter(), one page at a time, so
+        memory use does not grow with the size of the catalog.
+
+        Args:
+            csv_file_path (str): Path of the CSV file to write. A .parquet path writes
+                a Parquet file instead (requires pyarrow).
+            filters (dict): Same filter options as get_products_with_filter()
+            first (int): Number of products per page (max 250)
+            fields (list): Only select these product fields (see get_products_with_filter())
+        """
+        print(f'Exporting products with filters: {filters} to {csv_file_path}...')
+
+        self._write_products_csv(self.iter_products_with_filter(filters=filters, first=first, fields=fields), csv_file_path, products_per_write=first, fields=fields)
+
+    def _products_to_dataframe(self, products, fields=None):
+        """
+        Builds the fetch_all_products_with_filter() DataFrame from an iterable
+        of product nodes, leaving the columns of unrequested fields empty.
+        """
+        df, product_count = self._products_frame(products)
+
+        print(f"Completed fetching all {product_count} products")
+
+        for col in self._unprojected_columns(fields):
+            df[col] = ''
+        
+        print(f"Converted to DataFrame with {len(df)} rows and {len(df.columns)} columns")
+        return df
+
+
+    def _write_products_csv(self, products, csv_file_path, products_per_write=250, fields=None):
+        """
+        Streams product nodes into a CSV (or .parquet) file with the
+        fetch_all_products_with_filter() layout, writing every products_per_write products.
+        """
+        unprojected_columns = self._unprojected_columns(fields)
+        parquet = _is_parquet(csv_file_path)
+        writer = None
+        batch = []
+        product_count = 0
+        row_count = 0
+        header = True
+        for product in products:
+            batch.append(product)
+            if len(batch) == products_per_write:
+                df, count = self._products_frame(batch)
+                df = df.assign(**dict.fromkeys(unprojected_columns, ''))
+                if parquet:
+                    writer = self._append_parquet(df, csv_file_path, writer)
+                else:
+                    df.to_csv(csv_file_path, mode='w' if header else 'a', header=header, index=False)
+                product_count += count
+                row_count += len(df)
+                header = False
+                batch = []
+
+        if batch or header:
+            df, count = self._products_frame(batch)
+            df = df.assign(**dict.fromkeys(unprojected_columns, ''))
+            if parquet:
+                writer = self._append_parquet(df, csv_file_path, writer)
+            else:
+                df.to_csv(csv_file_path, mode='w' if header else 'a', header=header, index=False)
+            product_count += count
+            row_count += len(df)
+
+        if writer is not None:
+            writer.close()
+
+        print(f"Exported {product_count} products ({row_count} rows) to {csv_file_path}")
+
+    # ================================== Bulk Export ================================
+    def run_bulk_query(self, query):
+        print('Running bulk query...')
+        mutation = '''
+            mutation ($query: String!){
+                bulkOperationRunQuery(query: $query)
+                {
+                    bulkOperation {
+                        id
+                        status
+                    }
+                    userErrors {
+                        field
+                        message
+                    }
+                }
+            }
+        '''
+
+        variables = {
+            'query': query
+        }
+
+        return self.send_request(query=mutation, variables=variables)
+
+    def _bulk_products_query(self, filters=None, media=False, fields=None):
+        query_string = self._build_products_filter_query(filters)
+        products_args = '(query: %s)' % json.dumps(query_string) if query_string else ''
+        return '''
+            {
+                products%s {
+                    edges {
+                        node {%s}
+                    }
+                }
+            }
+        ''' % (products_args, self._product_selection(bulk=True, media=media, fields=fields))
+
+    def iter_bulk_jsonl(self, url):
+        """
+        Streams a bulk operation result file and yields one parsed object per line.
+        """
+        with httpx.stream('GET', url, timeout=None, follow_redirects=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line.strip():
+                    yield _loads_jsonl(line)
+
+    def _nest_bulk_products(self, lines):
+        """
+        Rebuilds product nodes from bulk query result lines. Variants (and media)
+        come as separate lines carrying the product id in __parentId and follow
+        their product, so each product is yielded as soon as the next one starts.
+        """
+        product = None
+        for line in lines:
+            parent_id = line.pop('__parentId', None)
+            if parent_id is None:
+                if product is not None:
+                    yield product
+                product = line
+                product['variants'] = {'nodes': []}
+            elif product is not None and parent_id == product['id']:
+                if line['id'].startswith('gid://shopify/ProductVariant/'):
+                    product['variants']['nodes'].append(line)
+                else:
+                    product.setdefault('media', {'nodes': []})['nodes'].append(line)
+            else:
+                print(f"Warning: Skipping line whose parent {parent_id} is not the current product")
+
+        if product is not None:
+            yield product
+
+    def iter_bulk_products(self, filters=None, media=False, fields=None):
+        """
+        Exports products matching the filters with bulkOperationRunQuery and
+        lazily yields product nodes in the same shape as get_products_with_filter().
+
+        Args:
+            filters (dict): Same filter options as get_products_with_filter()
+            media (bool): Also select product media
+            fields (list): Only select these product fields (see get_products_with_filter())
+        """
+        print(f'Exporting products in bulk with filters: {filters}...')
+        response = self.run_bulk_query(query=self._bulk_products_query(filters, media=media, fields=fields))
+        operation = self.wait_for_bulk_operation(self._bulk_operation_id(response, mutation_name='bulkOperationRunQuery'))
+
+        # A query without matches completes with no result file
+        if not operation['url']:
+            return
+
+        yield from self._cache_products(self._nest_bulk_products(self.iter_bulk_jsonl(operation['url'])), catalog=fields is None)
+
+    def fetch_all_products_bulk(self, filters=None, fields=None):
+        """
+        Bulk-operation counterpart of fetch_all_products_with_filter(). Returns a
+        DataFrame with the same columns and layout.
+
+        Args:
+            filters (dict): Same filter options as get_products_with_filter()
+            fields (list): Only select these product fields (see get_products_with_filter())
+        """
+        return self._products_to_dataframe(self.iter_bulk_products(filters=filters, fields=fields), fields=fields)
+
+    def export_products_bulk(self, csv_file_path, filters=None, fields=None):
+        """
+        Bulk-operation counterpart of export_products_with_filter(). The result
+        file is streamed into the CSV without loading the catalog in memory.
+
+        Args:
+            csv_file_path (str): Path of the CSV (or .parquet) file to write.
+            filters (dict): Same filter options as get_products_with_filter()
+            fields (list): Only select these product fields (see get_products_with_filter())
+        """
+        self._write_products_csv(self.iter_bulk_products(filters=filters, fields=fields), csv_file_path, fields=fields)
+
+    # ================================== Catalog Mirror ================================
+    def _get_catalog(self):
+        if self.catalog is None:
+            self.catalog = CatalogStore(path=f'.{self.store_name}.catalog.sqlite')
+        return self.catalog
+
+    def sync_catalog(self, filters=None, bulk=True, media=True):
+        """
+        Fills the local catalog mirror with the products matching the filters,
+        through a bulk export or the paginated reader. Once the catalog is set,
+        every product read keeps it up to date and handle lookups are answered
+        from it first.
+
+        Args:
+            filters (dict): Same filter options as get_products_with_filter()
+            bulk (bool): Use a bulk query instead of paginating
+            media (bool): Also store product media
+
+        The IDs listed are recorded under the filter set, for reconcile_catalog().
+        A page that cannot be fetched raises PaginationError.
+
+        Returns:
+            int: Number of products stored.
+        """
+        catalog = self._get_catalog()
+        if bulk:
+            products = self.iter_bulk_products(filters=filters, media=media)
+        else:
+            products = self.iter_products_with_filter(filters=filters, media=media, strict=True)
+        listed = []
+        try:
+            for product in products:
+                listed.append(product['id'])
+        finally:
+            catalog.add_scope_ids(self._catalog_scope(filters), listed)
+        print(f'Catalog synced: {len(listed)} products')
+        return len(listed)
+
+    def _catalog_scope(self, filters):
+        # Products synced with a filter set are recorded under its search query
+        return self._build_products_filter_query(filters) or ''
+
+    def sync_catalog_incremental(self, filters=None, bulk=False, media=True, reconcile=None, reconcile_interval=86400):
+        """
+        Brings the catalog mirror up to date by fetching only the products updated
+        since the last run. The high-water updatedAt seen is stored in the catalog
+        (per filter set) once the listing completed; the first run fetches
+        everything. Pages are listed by updatedAt, and a page that cannot be
+        fetched raises PaginationError without moving the watermark.
+
+        Updates never report deletions, so every reconcile_interval seconds (or
+        when reconcile is True) the product IDs of the shop are listed and
+        products synced with these filters that no longer exist or no longer
+        match them are removed (see reconcile_catalog()).
+
+        Args:
+            filters (dict): Same filter options as get_products_with_filter()
+            bulk (bool): Use bulk queries instead of paginating (better for large change sets)
+            media (bool): Also store product media
+            reconcile (bool, optional): Force (True) or skip (False) the ID reconciliation.
+            reconcile_interval (float): Seconds between reconciliations when reconcile is None.
+
+        Returns:
+            dict: Number of products upserted and removed, and the new watermark.
+        """
+        catalog = self._get_catalog()
+        query_string = self._build_products_filter_query(filters)
+        watermark_key = f'updated_at:{query_string}'
+        reconciled_key = f'reconciled_at:{query_string}'
+        watermark = catalog.get_state(watermark_key)
+
+        sync_filters = dict(filters or {})
+        if watermark:
+            # Inclusive, so products updated within the same second as the watermark are not missed
+            sync_filters['updated_at'] = f">='{watermark}'"
+            print(f'Syncing catalog: products updated since {watermark}...')
+        else:
+            print('Syncing catalog: no watermark yet, fetching all products...')
+
+        if bulk:
+            products = self.iter_bulk_products(filters=sync_filters, media=media)
+        else:
+            products = self.iter_products_with_filter(filters=sync_filters, media=media, sort_key='UPDATED_AT', strict=True)
+        listed = []
+        latest = watermark
+        try:
+            for product in products:
+                listed.append(product['id'])
+                updated_at = product.get('updatedAt')
+                if updated_at and (latest is None or updated_at > latest):
+                    latest = updated_at
+        finally:
+            catalog.add_scope_ids(self._catalog_scope(filters), listed)
+        upserted = len(listed)
+        # Only reached when the listing completed, so no product older than latest was skipped
+        if latest:
+            catalog.set_state(watermark_key, latest)
+
+        removed = 0
+        if reconcile is None:
+            reconciled_at = catalog.get_state(reconciled_key)
+            reconcile = reconciled_at is None or time.time() - float(reconciled_at) >= reconcile_interval
+        if reconcile:
+            removed = self.reconcile_catalog(filters=filters, bulk=bulk)
+            catalog.set_state(reconciled_key, str(time.time()))
+
+        print(f'Catalog synced: {upserted} products upserted, {removed} removed, watermark {latest}')
+        return {'upserted': upserted, 'removed': removed, 'watermark': latest}
+
+    def reconcile_catalog(self, filters=None, bulk=False):
+        """
+        Removes products from the catalog mirror (and the handle cache) that a
+        sync with these filters stored and whose IDs the shop no longer returns
+        for them. A product that another filter set still lists stays.
+
+        The ID listing must complete: a page that cannot be fetched raises
+        PaginationError (a failed bulk query BulkOperationError) and nothing is
+        removed.
+
+        Returns:
+            int: Number of products removed.
+        """
+        print('Reconciling catalog product ids...')
+        catalog = self._get_catalog()
+        scope = self._catalog_scope(filters)
+        live_ids = set(self._iter_product_ids(filters=filters, bulk=bulk))
+        # Stored products the listing returns belong to the scope, also when an earlier sync did not record them
+        catalog.add_scope_ids(scope, live_ids & catalog.product_ids())
+        stale = list(catalog.scope_ids(scope) - live_ids)
+        removed = catalog.remove_scope_ids(scope, stale) if stale else []
+        if removed:
+            catalog.delete_products(removed)
+            self._get_handle_cache().delete_ids(removed)
+        print(f'{len(removed)} products removed from the catalog')
+        return len(removed)
+
+    def _iter_product_ids(self, filters=None, bulk=False):
+        """
+        Yields the IDs of all products matching the filters, selecting nothing else.
+        """
+        query_string = self._build_products_filter_query(filters)
+        if bulk:
+            products_args = '(query: %s)' % json.dumps(query_string) if query_string else ''
+            response = self.run_bulk_query(query='{ products%s { edges { node { id } } } }' % products_args)
+            operation = self.wait_for_bulk_operation(self._bulk_operation_id(response, mutation_name='bulkOperationRunQuery'))
+            if operation['url']:
+                for line in self.iter_bulk_jsonl(operation['url']):
+                    yield line['id']
+            return
+
         query = '''
-            query(
-                $query: String,
-                $after: String,
-                $first: Int
-            )
-            {
+            query($query: String, $after: String, $first: Int) {
                 products(first: $first, query: $query, after: $after) {
                     edges {
                         node {
                             id
-                            handle
-                            title
-                            description
-                            vendor
-                            productType
-                            tags
-                            status
-                            createdAt
-                            updatedAt
-                            seoTitle: metafield(key: "title", namespace: "global") {
-                                value
-                            }
-                            seoDescription: metafield(key: "description", namespace: "global") {
-                                value
-                            }
-                            metafield_vendor_sku: metafield(key: "vendor_sku", namespace: "custom"){
-                                value
-                            }
-                            metafield_enable_best_price: metafield(key: "enable_best_price", namespace: "custom"){
-                                value
-                            }
-                            metafield_arrives_before_christmas: metafield(key: "arrives_before_christmas", namespace: "custom"){
-                                value
-                            }
-                            metafield_info_meta_text: metafield(key: "info_meta_text", namespace: "custom"){
-                                value
-                            }
-                            isGiftCard
-                            variants(first: 100) {
-                                nodes {
-                                    id
-                                    sku
-                                    price
-                                    compareAtPrice
-                                    inventoryQuantity
-                                    barcode
-                                    inventoryItem {
-                                        measurement{
-                                            weight {
-                                                unit
-                                                value
-                                            }
-                                        }
-                                        tracked
-                                    }
-                                }
-                            }
                         }
                     }
                     pageInfo {
@@ -1243,228 +4201,22 @@ class ShopifyApp:
                 }
             }
         '''
-        
         variables = {
             'query': query_string,
-            'first': first
+            'first': 250
         }
-        
-        if after:
-            variables['after'] = after
-        
-        return self.send_request(query=query, variables=variables)
+        for product in self.paginate(query=query, connection_path='products', variables=variables, strict=True):
+            yield product['id']
 
-    def fetch_all_products_with_filter(self, filters=None, first=250):
+    def catalog_dataframe(self):
         """
-        Fetches all products matching the filter criteria with automatic pagination.
-        Returns a pandas DataFrame with all headers needed for csv_to_jsonl function.
-        
-        Args:
-            filters (dict): Same filter options as get_products_with_filter()
-            first (int): Number of products per page (max 250)
-            
-        Returns:
-            pd.DataFrame: DataFrame with all columns required by csv_to_jsonl():
-                - Handle, Title, Body (HTML), Vendor, Product Category, Type, Tags, Published
-                - Status, Gift Card, SEO Title, SEO Description
-                - Option1/2/3 Name, Value, Linked To
-                - Variant SKU, Grams, Inventory Tracker, Policy, Fulfillment Service
-                - Variant Price, Compare At Price, Requires Shipping, Taxable, Barcode
-                - Variant Image, Weight Unit, Cost per item
-                - Image Src, Position, Alt Text
-                - Available Qty
-                - Vendor SKU, enable_best_price, arrives_before_christmas metafields
-        
-        Example:
-            # Fetch all in-stock products and convert to JSONL
-            df = app.fetch_all_products_with_filter({'inventory_total': '>0'})
-            app.csv_to_jsonl_from_dataframe(df, 'data/products.jsonl', mode='product')
+        Returns the catalog mirror in the layout of fetch_all_products_with_filter(),
+        without any API calls.
         """
-        print(f'Fetching all products with filters: {filters}...')
-        
-        records = []
-        cursor = None
-        has_next_page = True
-        page_count = 0
-        
-        while has_next_page:
-            page_count += 1
-            response = self.get_products_with_filter(filters=filters, after=cursor, first=first)
-            
-            if response and 'data' in response and 'products' in response['data']:
-                edges = response['data']['products']['edges']
-                products = [edge['node'] for edge in edges]
-                records.extend(products)
-                
-                print(f"Page {page_count}: Fetched {len(products)} products (Total: {len(records)})")
-                
-                page_info = response['data']['products']['pageInfo']
-                has_next_page = page_info.get('hasNextPage', False)
-                cursor = page_info.get('endCursor')
-            else:
-                print("Error: No valid response received")
-                break
-        
-        print(f"Completed fetching all {len(records)} products")
-        
-        # Convert to DataFrame with all required headers for csv_to_jsonl
-        df_rows = []
-        for product in records:
-            # Extract metafield values
-            vendor_sku = ''
-            enable_best_price = ''
-            arrives_before_christmas = ''
-            info_meta_text = ''
-            
-            # Helper function to get metafield value
-            def get_metafield_value(product, key):
-                # Note: The GraphQL response returns metafield as a single object, not a list
-                # Check if it exists and has a value
-                metafield_obj = product.get(f'metafield_{key}')
-                if metafield_obj and isinstance(metafield_obj, dict):
-                    return metafield_obj.get('value', '')
-                return ''
-            
-            vendor_sku = get_metafield_value(product, 'vendor_sku')
-            enable_best_price = get_metafield_value(product, 'enable_best_price')
-            arrives_before_christmas = get_metafield_value(product, 'arrives_before_christmas')
-            info_meta_text = get_metafield_value(product, 'info_meta_text')
-            
-            # Extract gift card flag
-            is_gift_card = product.get('isGiftCard', False)
-            gift_card_value = 'true' if is_gift_card else 'false'
-            
-            # Extract variant details
-            variants = product.get('variants', {}).get('nodes', [])
-            
-            # Create base row with product info
-            base_row = {
-                'ID': product.get('id', ''),
-                'Handle': product.get('handle', ''),
-                'Title': product.get('title', ''),
-                'Body (HTML)': product.get('description', ''),
-                'Vendor': product.get('vendor', ''),
-                'Product Category': 'gid://shopify/TaxonomyCategory/tg-5-20-1',  # Default category
-                'Type': product.get('productType', ''),
-                'Tags': ','.join(product.get('tags', [])) if product.get('tags') else '',
-                'Published': 'true',  # Default to published; adjust if needed
-                'Status': product.get('status', 'ACTIVE'),
-                'Gift Card': gift_card_value,
-                'SEO Title': '',
-                'SEO Description': '',
-                'Option1 Name': '',
-                'Option1 Value': '',
-                'Option1 Linked To': '',
-                'Option2 Name': '',
-                'Option2 Value': '',
-                'Option2 Linked To': '',
-                'Option3 Name': '',
-                'Option3 Value': '',
-                'Option3 Linked To': '',
-                'Vendor SKU': vendor_sku,
-                'enable_best_price (product.metafields.custom.enable_best_price)': enable_best_price,
-                'arrives_before_christmas (product.metafields.custom.arrives_before_christmas)': arrives_before_christmas,
-                'info_meta_text (product.metafields.custom.info_meta_text)': info_meta_text,
-            }
-            
-            # If no variants, add single empty row for the product
-            if not variants:
-                row = base_row.copy()
-                row.update({
-                    'Variant SKU': '',
-                    'Variant Grams': '',
-                    'Variant Inventory Tracker': 'shopify',
-                    'Variant Inventory Policy': 'deny',
-                    'Variant Fulfillment Service': 'manual',
-                    'Variant Price': '',
-                    'Variant Compare At Price': '',
-                    'Variant Requires Shipping': 'true',
-                    'Variant Taxable': 'true',
-                    'Variant Barcode': '',
-                    'Variant Image': '',
-                    'Variant Weight Unit': 'g',
-                    'Cost per item': '',
-                    'Image Src': '',
-                    'Image Position': '',
-                    'Image Alt Text': '',
-                    'Available Qty': '',
-                })
-                df_rows.append(row)
-            else:
-                # Add a row for each variant
-                for idx, variant in enumerate(variants):
-                    # Extract weight information from inventoryItem
-                    variant_grams = ''
-                    variant_weight_unit = 'g'
-                    variant_tracked = False
-                    
-                    inventory_item = variant.get('inventoryItem', {})
-                    if inventory_item and isinstance(inventory_item, dict):
-                        weight_obj = inventory_item.get('weight', {})
-                        if weight_obj and isinstance(weight_obj, dict):
-                            variant_grams = str(weight_obj.get('value', ''))
-                            weight_unit = weight_obj.get('unit', 'GRAMS')
-                            # Map Shopify weight units
-                            unit_map = {'KILOGRAMS': 'kg', 'GRAMS': 'g', 'POUNDS': 'lb', 'OUNCES': 'oz'}
-                            variant_weight_unit = unit_map.get(weight_unit, 'g')
-                        # detect whether this variant is inventory-tracked
-                        variant_tracked = bool(inventory_item.get('tracked', False))
-                    
-                    row = base_row.copy()
-                    row.update({
-                        'Variant SKU': variant.get('sku', ''),
-                        'Variant Grams': variant_grams,
-                        'Variant Inventory Tracker': 'shopify' if variant_tracked else '',
-                        'Variant Inventory Policy': 'deny',
-                        'Variant Fulfillment Service': 'manual',
-                        'Variant Price': str(variant.get('price', '')),
-                        'Variant Compare At Price': str(variant.get('compareAtPrice', '')) if variant.get('compareAtPrice') else '',
-                        'Variant Requires Shipping': 'true',
-                        'Variant Taxable': 'true',
-                        'Variant Barcode': variant.get('barcode', ''),
-                        'Variant Image': '',
-                        'Variant Weight Unit': variant_weight_unit,
-                        'Cost per item': '',
-                        'Image Src': '',
-                        'Image Position': '',
-                        'Image Alt Text': '',
-                        'Available Qty': str(variant.get('inventoryQuantity', '')),
-                    })
-                    df_rows.append(row)
-        
-        # Create DataFrame
-        df = pd.DataFrame(df_rows)
-        
-        # Ensure all required columns exist with empty strings as defaults
-        required_columns = [
-            'ID', 'Handle', 'Title', 'Body (HTML)', 'Vendor', 'Product Category', 'Type', 'Tags', 'Published',
-            'Option1 Name', 'Option1 Value', 'Option1 Linked To',
-            'Option2 Name', 'Option2 Value', 'Option2 Linked To',
-            'Option3 Name', 'Option3 Value', 'Option3 Linked To',
-            'Variant SKU', 'Variant Grams', 'Variant Inventory Tracker',
-            'Variant Inventory Policy', 'Variant Fulfillment Service',
-            'Variant Price', 'Variant Compare At Price', 'Variant Requires Shipping',
-            'Variant Taxable', 'Variant Barcode', 'Image Src', 'Image Position',
-            'Image Alt Text', 'Gift Card', 'SEO Title', 'SEO Description',
-            'Variant Image', 'Variant Weight Unit', 'Cost per item', 'Available Qty',
-            'Status', 'Vendor SKU',
-            'enable_best_price (product.metafields.custom.enable_best_price)',
-            'arrives_before_christmas (product.metafields.custom.arrives_before_christmas)',
-            'info_meta_text (product.metafields.custom.info_meta_text)'
-        ]
-        
-        for col in required_columns:
-            if col not in df.columns:
-                df[col] = ''
-        
-        # Reorder columns to match expected format
-        df = df[required_columns]
-        
-        print(f"Converted to DataFrame with {len(df)} rows and {len(df.columns)} columns")
-        return df
+        return self._products_to_dataframe(self._get_catalog().iter_products())
 
     # =================================== Publications =================================
-    def query_publication(self):
+    async def query_publication_async(self):
         print("Fetching publications data...")
         query = '''
             {
@@ -1476,10 +4228,13 @@ class ShopifyApp:
             }
         '''
 
-        return self.send_request(query=query)
-    
+        return await self.send_request_async(query=query)
+
+    def query_publication(self):
+        return self._run(self.query_publication_async())
+
     # =================================== Locations =================================
-    def query_locations(self):
+    async def query_locations_async(self):
         print('Getting location...')
         query = '''
             {
@@ -1508,7 +4263,10 @@ class ShopifyApp:
             }
         '''
 
-        return self.send_request(query=query)
+        return await self.send_request_async(query=query)
+
+    def query_locations(self):
+        return self._run(self.query_locations_async())
 
     def get_product_tags(self):
         print('Getting product tags...')
@@ -1550,11 +4308,11 @@ class ShopifyApp:
         print('')
 
     # ================================== Pool Operation Status ================================
-    def pool_operation_status(self):
+    def pool_operation_status(self, operation_type='MUTATION'):
         print("Pooling operation status...")
         query = '''
                     query {
-                        currentBulkOperation(type: MUTATION) {
+                        currentBulkOperation(type: %s) {
                             id
                             status
                             errorCode
@@ -1566,7 +4324,7 @@ class ShopifyApp:
                             partialDataUrl
                         }
                     }
-                '''
+                ''' % operation_type
 
         return self.send_request(query=query)
     
@@ -1590,39 +4348,288 @@ class ShopifyApp:
         status = response_data['data']['node']['status']
         return status
     
-    def get_file(self, created_at, updated_at, after):
-        print("Fetching file data...")
-        if after == '':
-            query = '''
-                    query getFilesByCreatedAt($query:String!){
-                        files(first:250, query:$query) {
-                            edges {
-                                node {
-                                    ... on MediaImage {
-                                        id
-                                        alt
-                                        image {
-                                            id
-                                            altText
-                                            url
-                                        }
-                                    }
-                                }
-                            }
-                            pageInfo{
-                                hasNextPage
-                                endCursor
-                            }
-                        }
+    # ================================== Bulk Operation Watcher ================================
+    def get_bulk_operation(self, bulk_operation_id):
+        query = '''
+            query ($id: ID!) {
+                node(id: $id) {
+                    ... on BulkOperation {
+                        id
+                        status
+                        errorCode
+                        createdAt
+                        completedAt
+                        objectCount
+                        fileSize
+                        url
+                        partialDataUrl
                     }
-                    '''
+                }
+            }
+        '''
 
-            variables = {'query': "(created_at:>={}) AND (updated_at:<={})".format(created_at, updated_at)}
+        variables = {
+            'id': bulk_operation_id
+        }
 
-        else:
+        response = self.send_request(query=query, variables=variables)
+        if not response or not response['data']['node']:
+            raise BulkOperationError(f'Bulk operation {bulk_operation_id} could not be fetched')
+        return response['data']['node']
+
+    def _bulk_operation_id(self, response, mutation_name='bulkOperationRunMutation'):
+        """
+        Returns the id of the bulk operation started by a bulkOperationRunMutation
+        or bulkOperationRunQuery response, raising BulkOperationError if it was rejected.
+        """
+        if not response:
+            raise BulkOperationError('Bulk operation could not be started')
+        payload = response['data'][mutation_name]
+        if payload['userErrors'] or not payload['bulkOperation']:
+            raise BulkOperationError(f"Bulk operation rejected: {payload['userErrors']}")
+        return payload['bulkOperation']['id']
+
+    @staticmethod
+    def _count_lines(file_path):
+        with _open_jsonl(file_path) as f:
+            return sum(1 for _ in f)
+
+    def wait_for_bulk_operation(self, bulk_operation_id, expected_count=None, min_interval=1.0, max_interval=30.0, timeout=None):
+        """
+        Waits for a specific bulk operation to finish and returns its final state.
+
+        Polling adapts to the observed objectCount rate: with expected_count
+        (e.g. the number of JSONL lines) the next check is scheduled around half
+        the estimated remaining time; without progress the interval backs off.
+        When webhook_receiver is set, the wait ends as soon as its
+        BULK_OPERATIONS_FINISH webhook arrives, with polling every max_interval
+        seconds only as a fallback.
+
+        Args:
+            bulk_operation_id (str): BulkOperation GID.
+            expected_count (int, optional): Number of objects the operation will process.
+            min_interval (float): Shortest delay between status checks, in seconds.
+            max_interval (float): Longest delay between status checks, in seconds.
+            timeout (float, optional): Give up after this many seconds.
+
+        Returns:
+            dict: The BulkOperation (status, errorCode, objectCount, url, partialDataUrl, ...).
+
+        Raises:
+            BulkOperationError: The operation FAILED, was CANCELED or EXPIRED, or timed out.
+        """
+        print(f'Waiting for bulk operation {bulk_operation_id}...')
+        started = time.monotonic()
+        interval = min_interval
+        last_count = None
+        last_checked = None
+        # Set once the webhook arrived; the polled status may still lag behind it
+        notified = False
+
+        while True:
+            operation = self.get_bulk_operation(bulk_operation_id)
+            status = operation['status']
+            count = int(operation.get('objectCount') or 0)
+            now = time.monotonic()
+
+            if status == 'COMPLETED':
+                print(f'Bulk operation completed: {count} objects in {now - started:.1f}s')
+                return operation
+            if status in ('FAILED', 'CANCELED', 'EXPIRED'):
+                raise BulkOperationError(f"Bulk operation {bulk_operation_id} {status} ({operation.get('errorCode')})", operation)
+
+            if last_count is not None:
+                if count > last_count:
+                    rate = (count - last_count) / (now - last_checked)
+                    if expected_count:
+                        interval = max(expected_count - count, 0) / rate / 2
+                else:
+                    interval *= 1.5
+            interval = min(max(interval, min_interval), max_interval)
+            last_count = count
+            last_checked = now
+
+            if timeout is not None and now - started >= timeout:
+                raise BulkOperationError(f'Bulk operation {bulk_operation_id} did not finish within {timeout}s', operation)
+
+            if self.webhook_receiver is not None and not notified:
+                print(f'Bulk operation {status}: {count} objects, waiting for webhook...')
+                notified = self.webhook_receiver.wait(bulk_operation_id, timeout=max_interval) is not None
+            else:
+                print(f'Bulk operation {status}: {count} objects, next check in {interval:.1f}s')
+                time.sleep(interval)
+
+    # ================================== Bulk Mutation Results ================================
+    def ingest_bulk_mutation_result(self, operation, jsonl_file_path, report_path=None, retry_jsonl_path=None, line_numbers=None,
+                                    retry_missing=True):
+        """
+        Streams the result file of a bulk mutation and joins each result line back
+        to its input line (via __lineNumber) and product handle.
+
+        Input lines whose result carries GraphQL errors or userErrors, or that have
+        no result at all (e.g. the operation stopped early), count as failed. The
+        handle -> id pairs of returned products are recorded in the handle cache,
+        and the ids of products reported as not found are dropped from it, so a
+        product deleted in the admin is looked up again next time.
+
+        Args:
+            operation (dict): Finished BulkOperation, as returned by wait_for_bulk_operation().
+            jsonl_file_path (str): The JSONL file the operation was submitted with.
+            report_path (str, optional): Write a failure report CSV (line_number, handle, field, message) here.
+            retry_jsonl_path (str, optional): Write the failed input lines here, ready to resubmit.
+            line_numbers (list, optional): Line numbers to report for each input line, when the
+                JSONL is itself a retry file cut from a larger one.
+            retry_missing (bool): Also write the lines without any result to retry_jsonl_path.
+
+        Returns:
+            list: One dict per error with line_number, handle, field and message.
+        """
+        url = operation.get('url') or operation.get('partialDataUrl')
+        errors = {}
+        handles = {}
+        seen = set()
+        products = []
+        if url:
+            for line in self.iter_bulk_jsonl(url):
+                line_number = line.get('__lineNumber')
+                seen.add(line_number)
+                line_errors = [{'field': None, 'message': error.get('message')} for error in line.get('errors') or []]
+                for payload in (line.get('data') or {}).values():
+                    payload = payload or {}
+                    product = payload.get('product')
+                    if product:
+                        products.append(product)
+                        handles[line_number] = product.get('handle')
+                    for user_error in payload.get('userErrors') or []:
+                        line_errors.append({'field': '.'.join(map(str, user_error.get('field') or [])) or None, 'message': user_error.get('message')})
+                if line_errors:
+                    errors[line_number] = line_errors
+        self._cache_product_ids(products)
+
+        failures = []
+        failed_lines = []
+        failed_count = 0
+        stale_ids = []
+        with _open_jsonl(jsonl_file_path) as f:
+            for line_number, line in enumerate(f):
+                if line_number in seen and line_number not in errors:
+                    continue
+                variables = _loads_jsonl(line)
+                handle = handles.get(line_number) or self._bulk_input_handle(variables)
+                if self._product_not_found(errors.get(line_number, [])):
+                    product_id = self._bulk_input_product_id(variables)
+                    if product_id:
+                        stale_ids.append(product_id)
+                for error in errors.get(line_number, [{'field': None, 'message': BULK_NO_RESULT_MESSAGE}]):
+                    failures.append({'line_number': line_numbers[line_number] if line_numbers else line_number, 'handle': handle, **error})
+                failed_count += 1
+                if retry_missing or line_number in errors:
+                    failed_lines.append(line)
+
+        if stale_ids:
+            print(f'Dropping {len(stale_ids)} products that no longer exist from the handle cache')
+            self._get_handle_cache().delete_ids(stale_ids)
+
+        print(f'Bulk result: {len(seen)} lines returned, {failed_count} failed')
+        if report_path and failures:
+            self._write_failure_report(failures, report_path)
+        if retry_jsonl_path and failed_lines:
+            with _open_jsonl(retry_jsonl_path, 'wb') as f:
+                f.writelines(failed_lines)
+
+        return failures
+
+    @staticmethod
+    def _bulk_input_handle(variables):
+        # Product inputs carry the handle; variant and publish inputs only the product id
+        product = variables.get('product') or {}
+        return product.get('handle') or product.get('id') or variables.get('productId') or variables.get('id')
+
+    @staticmethod
+    def _bulk_input_product_id(variables):
+        product = variables.get('product') or {}
+        return product.get('id') or variables.get('productId') or variables.get('id')
+
+    @staticmethod
+    def _product_not_found(errors):
+        return any(
+            any(message in (error.get('message') or '').lower() for message in BULK_PRODUCT_NOT_FOUND_MESSAGES)
+            for error in errors
+        )
+
+    @staticmethod
+    def _write_failure_report(failures, report_path):
+        pd.DataFrame(failures, columns=['line_number', 'handle', 'field', 'message']).to_csv(report_path, index=False)
+        print(f'Failure report saved to {report_path}')
+
+    @staticmethod
+    def _bulk_report_path(jsonl_file_path, phase):
+        base = os.path.splitext(jsonl_file_path)[0]
+        # Pipeline JSONL files are already named after their phase
+        if not base.endswith(f'.{phase}'):
+            base = f'{base}.{phase}'
+        return f'{base}.failures.csv'
+
+    def run_bulk_mutation(self, phase, jsonl_file_path):
+        """
+        Uploads a JSONL file and runs the bulk mutation of the given pipeline phase
+        ('product', 'variant', 'publish' or 'update') on it.
 
-            query = '''
-            query getFilesByCreatedAt($query:String!, $after:String!){
+        Returns:
+            dict: The finished BulkOperation.
+        """
+        staged_target = self.generate_staged_target()
+        self.upload_jsonl(staged_target=staged_target, jsonl_path=jsonl_file_path)
+        bulk_operation_id = self._submit_bulk_step({'phase': phase, 'staged_target': staged_target})
+        return self.wait_for_bulk_operation(bulk_operation_id, expected_count=self._count_lines(jsonl_file_path))
+
+    def retry_bulk_failures(self, phase, jsonl_file_path, operation, max_retries=1):
+        """
+        Ingests the result of a bulk mutation and resubmits only the failed input
+        lines, up to max_retries times. The failure report next to the JSONL file
+        always describes the failures that remain.
+
+        In the create phases (BULK_CREATE_PHASES), lines that got no result at all
+        are reported but not resubmitted: they may have been created anyway.
+
+        Returns:
+            list: The remaining failures (see ingest_bulk_mutation_result()).
+        """
+        base = os.path.splitext(jsonl_file_path)[0]
+        report_path = self._bulk_report_path(jsonl_file_path, phase)
+        retry_missing = phase not in BULK_CREATE_PHASES
+        failures = self.ingest_bulk_mutation_result(operation, jsonl_file_path, report_path=report_path, retry_jsonl_path=f'{base}.retry1.jsonl',
+                                                    retry_missing=retry_missing)
+        # Failures that are reported without being resubmitted
+        kept = []
+        for attempt in range(1, max_retries + 1):
+            if not retry_missing:
+                kept += [failure for failure in failures if failure['message'] == BULK_NO_RESULT_MESSAGE]
+                failures = [failure for failure in failures if failure['message'] != BULK_NO_RESULT_MESSAGE]
+            if not failures:
+                break
+            retry_jsonl_path = f'{base}.retry{attempt}.jsonl'
+            # Report failures against the line numbers of the original JSONL
+            line_numbers = sorted(set(failure['line_number'] for failure in failures))
+            print(f'Retrying {len(line_numbers)} failed lines ({attempt}/{max_retries})...')
+            try:
+                operation = self.run_bulk_mutation(phase, retry_jsonl_path)
+            except BulkOperationError as e:
+                print(f'Error: Retry failed: {e}')
+                break
+            failures = self.ingest_bulk_mutation_result(operation, retry_jsonl_path, retry_jsonl_path=f'{base}.retry{attempt + 1}.jsonl',
+                                                        line_numbers=line_numbers, retry_missing=retry_missing)
+
+        failures = sorted(kept + failures, key=lambda failure: failure['line_number'])
+        if failures:
+            self._write_failure_report(failures, report_path)
+        elif os.path.isfile(report_path):
+            os.remove(report_path)
+        return failures
+
+    def _files_by_date_query(self):
+        return '''
+            query getFilesByCreatedAt($query:String!, $after:String){
                 files(first:250, after:$after, query:$query) {
                     edges {
                         node {
@@ -1645,14 +4652,26 @@ class ShopifyApp:
             }
             '''
 
-            variables = {'query': "(created_at:>={}) AND (updated_at:<={})".format(created_at, updated_at),
-                         'after': after}
+    def get_file(self, created_at, updated_at, after):
+        print("Fetching file data...")
+        query = self._files_by_date_query()
+        variables = {'query': "(created_at:>={}) AND (updated_at:<={})".format(created_at, updated_at),
+                     'after': after if after else None}
             
         return self.send_request(query=query, variables=variables)
 
+    def iter_files(self, created_at, updated_at):
+        """
+        Lazily yields the file nodes created after created_at and updated before
+        updated_at, following the cursor page by page.
+        """
+        variables = {'query': "(created_at:>={}) AND (updated_at:<={})".format(created_at, updated_at)}
+
+        return self.paginate(query=self._files_by_date_query(), connection_path='files', variables=variables)
+
     # Update
     # =================================== Update Products ================================
-    def update_product(self, product_variables):
+    async def update_product_async(self, product_variables):
         print('Updating Products...')
         product_mutation = '''
             mutation productUpdate($product: ProductUpdateInput) {
@@ -1668,16 +4687,23 @@ class ShopifyApp:
             }
         '''
 
-        return self.send_request(query=product_mutation, variables=product_variables)
+        return await self.send_request_async(query=product_mutation, variables=product_variables)
+
+    def update_product(self, product_variables):
+        return self._run(self.update_product_async(product_variables=product_variables))
 
     # ============================== Update Products Bulk ==============================
-    def update_products_bulk(self, csv_file_path, jsonl_file_path):
+    def update_products_bulk(self, csv_file_path, jsonl_file_path, snapshot_csv_path=None, skip_unchanged=False):
         """
         Updates multiple products in bulk using CSV data.
         
         Args:
             csv_file_path (str): Path to CSV file containing product update data.
             jsonl_file_path (str): Path where JSONL file will be saved.
+            snapshot_csv_path (str, optional): Product CSV of the current catalog. When given,
+                only changed products and fields are sent (see diff_products_csv()).
+            skip_unchanged (bool): Leave out products whose content hash matches the last
+                successful update (see product_content_hashes()).
         """
         print(f'Updating products from {csv_file_path}...')
         
@@ -1686,16 +4712,30 @@ class ShopifyApp:
             print(f"Error: CSV file not found at '{csv_file_path}'")
             return
         
-        # Convert CSV to JSONL format - use product mode but we'll remove invalid fields
-        self.csv_to_jsonl(csv_file_path=csv_file_path, jsonl_file_path=jsonl_file_path, mode='product')
-        
-        # Verify JSONL file was created
-        if not os.path.isfile(jsonl_file_path):
-            print(f"Error: JSONL file was not created at '{jsonl_file_path}'. Check CSV conversion for errors.")
+        content_hashes, skip_handles = self._changed_products(csv_file_path, 'update') if skip_unchanged else ({}, set())
+        if skip_unchanged and len(skip_handles) == len(content_hashes):
+            print('No changed products to update')
             return
-        
-        # Clean the JSONL to remove fields not valid for ProductUpdateInput
-        self._clean_jsonl_for_update(jsonl_file_path)
+
+        # Products that were not written to the JSONL must not count as pushed
+        unsent = []
+        if snapshot_csv_path:
+            # Only the products and fields that changed since the snapshot
+            summary = self.diff_products_csv(csv_file_path, snapshot_csv_path, jsonl_file_path, skip_handles=skip_handles)
+            unsent = summary['unresolved_handles']
+            if not summary['changed'] and not summary['new']:
+                print('No product changes to update')
+                if skip_unchanged:
+                    self._record_pushed_products(content_hashes, skip_handles, [], 'update', unsent=unsent)
+                return
+        else:
+            # Convert CSV to JSONL format with only the fields valid for ProductUpdateInput
+            self.csv_to_jsonl(csv_file_path=csv_file_path, jsonl_file_path=jsonl_file_path, mode='update', skip_handles=skip_handles)
+            
+            # Verify JSONL file was created
+            if not os.path.isfile(jsonl_file_path):
+                print(f"Error: JSONL file was not created at '{jsonl_file_path}'. Check CSV conversion for errors.")
+                return
         
         # Generate staged upload target
         staged_target = self.generate_staged_target()
@@ -1704,58 +4744,174 @@ class ShopifyApp:
         self.upload_jsonl(staged_target=staged_target, jsonl_path=jsonl_file_path)
         
         # Execute bulk update mutation
-        self.update_products(staged_target=staged_target)
+        response = self.update_products(staged_target=staged_target)
         
         # Wait for operation to complete
-        completed = False
-        while not completed:
-            time.sleep(3)
-            response = self.pool_operation_status()
-            if response['data']['currentBulkOperation']['status'] == 'COMPLETED':
-                completed = True
-                print('Product update is completed')
-
-    def _clean_jsonl_for_update(self, jsonl_file_path):
+        operation = self.wait_for_bulk_operation(self._bulk_operation_id(response), expected_count=self._count_lines(jsonl_file_path))
+        print('Product update is completed')
+        failures = self.ingest_bulk_mutation_result(operation, jsonl_file_path, report_path=self._bulk_report_path(jsonl_file_path, 'update'))
+        if skip_unchanged:
+            self._record_pushed_products(content_hashes, skip_handles, failures, 'update', unsent=unsent)
+
+    @staticmethod
+    def _update_product_input(product):
         """
-        Remove fields from JSONL that are not valid for ProductUpdateInput.
+        Reduces a ProductCreateInput record to the fields ProductUpdateInput accepts.
         ProductUpdateInput does not support: productOptions, giftCard
         """
-        import json
-        cleaned_lines = []
-        
-        with open(jsonl_file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    data = json.loads(line)
-                    if 'product' in data:
-                        # Remove productOptions and giftCard
-                        data['product'].pop('productOptions', None)
-                        data['product'].pop('giftCard', None)
-                        # Keep only id/handle + updatable fields
-                        product = data['product']
-                        cleaned_product = {
-                            'id': product.get('id'),
-                            'handle': product.get('handle'),
-                            'title': product.get('title'),
-                            'descriptionHtml': product.get('descriptionHtml'),
-                            'vendor': product.get('vendor'),
-                            'productType': product.get('productType'),
-                            'tags': product.get('tags'),
-                            'seo': product.get('seo'),
-                            'status': product.get('status'),
-                            'metafields': product.get('metafields'),
-                        }
-                        # Remove None values, but ALWAYS keep id (required for mutation)
-                        cleaned_product = {k: v for k, v in cleaned_product.items() if (k == 'id') or (v is not None and v != '')}
-                        data['product'] = cleaned_product
-                    cleaned_lines.append(json.dumps(data, ensure_ascii=False))
-                except json.JSONDecodeError:
-                    cleaned_lines.append(line.rstrip('\n'))
-        
-        # Write cleaned JSONL back
-        with open(jsonl_file_path, 'w', encoding='utf-8') as f:
-            for line in cleaned_lines:
-                f.write(line + '\n')
+        # Keep only id/handle + updatable fields
+        cleaned_product = {
+            'id': product.get('id'),
+            'handle': product.get('handle'),
+            'title': product.get('title'),
+            'descriptionHtml': product.get('descriptionHtml'),
+            'vendor': product.get('vendor'),
+            'productType': product.get('productType'),
+            'tags': product.get('tags'),
+            'seo': product.get('seo'),
+            'status': product.get('status'),
+            'metafields': product.get('metafields'),
+        }
+        # Remove None values, but ALWAYS keep id (required for mutation)
+        return {k: v for k, v in cleaned_product.items() if (k == 'id') or (v is not None and v != '')}
+
+    # ============================== Content Hashes ==============================
+    def product_content_hashes(self, csv_file_path):
+        """
+        Returns a stable content hash per handle, computed from the rows
+        csv_to_jsonl() groups for that product: product fields, options,
+        variants, media and metafields, in file order. Any edit to a product's
+        rows changes its hash, and a CSV and the Parquet file converted from it
+        hash the same.
+        """
+        df = self._read_product_table(csv_file_path, columns=['Handle', *PRODUCT_JSONL_COLUMNS], text=True)
+        groups = self._group_product_rows(df)
+        rows = _canonical_text_frame(groups['rows'][['Handle', *PRODUCT_JSONL_COLUMNS]])
+        row_hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+        return {
+            handle: hashlib.sha1(row_hashes[start:end].tobytes()).hexdigest()
+            for handle, start, end in zip(groups['first']['Handle'].tolist(), groups['starts'].tolist(), groups['ends'].tolist())
+        }
+
+    def _get_product_hashes(self):
+        if self.product_hashes is None:
+            self.product_hashes = ProductHashStore(path=f'.{self.store_name}.product_hashes.sqlite')
+        return self.product_hashes
+
+    def _changed_products(self, csv_file_path, scope):
+        """
+        Hashes the products of a CSV and compares them with the hashes last pushed
+        for scope ('import' or 'update'). Returns the hashes and the set of
+        unchanged handles.
+        """
+        content_hashes = self.product_content_hashes(csv_file_path)
+        pushed = self._get_product_hashes().get_many(scope, content_hashes)
+        unchanged = {handle for handle, content_hash in content_hashes.items() if pushed.get(handle) == content_hash}
+        print(f'Skipping {len(unchanged)} unchanged products, {len(content_hashes) - len(unchanged)} to {scope}')
+        return content_hashes, unchanged
+
+    def _record_pushed_products(self, content_hashes, skip_handles, failures, scope, unsent=()):
+        """
+        Stores the hashes of the products that were pushed without errors.
+        Handles in unsent were left out of the push and are not recorded.
+        """
+        unsent = set(unsent)
+        pushed = [handle for handle in content_hashes if handle not in skip_handles and handle not in unsent]
+        # Variant and publish failures are reported by product ID
+        failed = {failure['handle'] for failure in failures}
+        failed.discard(None)
+        product_ids = self._get_handle_cache().get_many(pushed)
+        pushed = [handle for handle in pushed if handle not in failed and product_ids.get(handle) not in failed]
+        self._get_product_hashes().put_many(scope, {handle: content_hashes[handle] for handle in pushed})
+
+    # ============================== Delta Update ==============================
+    def diff_products_csv(self, csv_file_path, snapshot_csv_path, jsonl_file_path, skip_handles=None):
+        """
+        Compares a product CSV against a snapshot of the catalog and writes a
+        ProductUpdateInput JSONL containing only the changed products, each with
+        only its changed fields.
+
+        The snapshot is any CSV in the product layout, e.g. the output of
+        export_products_with_filter() / fetch_all_products_with_filter() or the
+        CSV of the last update that was pushed. Fields the update would send are
+        compared after the same conversion csv_to_jsonl() applies; tags are
+        compared as sets and metafields one key at a time. Empty CSV values are
+        never sent, as in update_products_bulk(). Exports carry descriptionHtml in
+        'Body (HTML)' and the SEO title and description, so they compare like for
+        like with an incoming product CSV.
+
+        Args:
+            csv_file_path (str): Incoming product CSV.
+            snapshot_csv_path (str): Product CSV describing the current catalog.
+            jsonl_file_path (str): Where to write the update JSONL.
+            skip_handles (set, optional): Incoming handles to leave out.
+
+        Returns:
+            dict: Number of changed, unchanged, new and unresolved (no product ID) products,
+                and the unresolved handles, which are left out of the JSONL.
+        """
+        print(f'Diffing {csv_file_path} against snapshot {snapshot_csv_path}...')
+        incoming = self._update_inputs_by_handle(csv_file_path, skip_handles=skip_handles)
+        snapshot = self._update_inputs_by_handle(snapshot_csv_path)
+
+        # Product IDs: incoming CSV first, then the snapshot, then the handle cache / API
+        missing_ids = [handle for handle, product in incoming.items() if not product['id'] and not snapshot.get(handle, {}).get('id')]
+        resolved = self.resolve_product_ids(missing_ids) if missing_ids else {}
+
+        summary = {'changed': 0, 'unchanged': 0, 'new': 0, 'unresolved': 0, 'unresolved_handles': []}
+        with _open_jsonl(jsonl_file_path, 'wb') as f:
+            for handle, product in incoming.items():
+                product_id = product['id'] or snapshot.get(handle, {}).get('id') or resolved.get(handle)
+                if not product_id:
+                    summary['unresolved'] += 1
+                    summary['unresolved_handles'].append(handle)
+                    continue
+                if handle in snapshot:
+                    changes = self._product_changes(product, snapshot[handle])
+                else:
+                    # Not in the snapshot: nothing to compare against, send every field
+                    changes = {k: v for k, v in product.items() if k not in ('id', 'handle')}
+                    summary['new'] += 1
+                if not changes:
+                    summary['unchanged'] += 1
+                    continue
+                if handle in snapshot:
+                    summary['changed'] += 1
+                f.write(_dumps_jsonl({'product': {'id': product_id, **changes}}))
+
+        print(f"Delta: {summary['changed']} changed, {summary['new']} not in snapshot, {summary['unchanged']} unchanged, {summary['unresolved']} without product id")
+        return summary
+
+    def _update_inputs_by_handle(self, csv_file_path, skip_handles=None):
+        """
+        Reads a product CSV and returns handle -> ProductUpdateInput fields.
+        """
+        df = self._read_product_table(csv_file_path, columns=['ID', 'Handle', *PRODUCT_JSONL_COLUMNS]).fillna('')
+        if skip_handles:
+            df = df[~df['Handle'].isin(skip_handles)]
+        records = self._update_records(self._group_product_rows(df))
+        return {record['product']['handle']: record['product'] for record in records}
+
+    @staticmethod
+    def _product_changes(product, previous):
+        """
+        Returns the ProductUpdateInput fields of product that differ from previous.
+        """
+        changes = {}
+        for key, value in product.items():
+            if key in ('id', 'handle'):
+                continue
+            if key == 'tags':
+                if sorted(value) != sorted(previous.get('tags') or []):
+                    changes[key] = value
+            elif key == 'metafields':
+                previous_values = {(m['namespace'], m['key']): m['value'] for m in previous.get('metafields') or []}
+                metafields = [m for m in value if previous_values.get((m['namespace'], m['key'])) != m['value']]
+                if metafields:
+                    changes[key] = metafields
+            elif value != previous.get(key):
+                changes[key] = value
+        return changes
 
     def update_products(self, staged_target):
         """
@@ -1808,7 +4964,7 @@ class ShopifyApp:
         return response
 
     # ===================================== Publish Product ====================================
-    def publish_product(self, product_id, publication_input):
+    async def publish_product_async(self, product_id, publication_input):
         print("Publishing product...")
         publish_mutation = '''
             mutation publishablePublish($id: ID!, $input: [PublicationInput!]!) {
@@ -1837,7 +4993,10 @@ class ShopifyApp:
             "input": publication_input
         }
 
-        return self.send_request(query=publish_mutation, variables=publish_variables)
+        return await self.send_request_async(query=publish_mutation, variables=publish_variables)
+
+    def publish_product(self, product_id, publication_input):
+        return self._run(self.publish_product_async(product_id=product_id, publication_input=publication_input))
 
     def publish_products(self, staged_target):
         print('Publishing products...')
@@ -1978,7 +5137,7 @@ class ShopifyApp:
         return response
 
     # =========================== Update Files By Ids ============================
-    def update_file(self, file_variables):
+    async def update_file_async(self, file_variables):
         """
         file_variables format [
             {
@@ -2004,7 +5163,10 @@ class ShopifyApp:
             }
         '''
 
-        return self.send_request(query=file_mutation, variables=file_variables)
+        return await self.send_request_async(query=file_mutation, variables=file_variables)
+
+    def update_file(self, file_variables):
+        return self._run(self.update_file_async(file_variables=file_variables))
 
     def update_files(self, staged_target):
         print('Update Files...')
@@ -2039,9 +5201,12 @@ class ShopifyApp:
         df = pd.read_csv(csv_file_path)
         handles = df['Handle'].unique().tolist()
         
-        product_response = self.get_products_media_by_handle(handles=handles)
+        product_responses = self._run(self.gather_bounded([
+            self.get_products_media_by_handle_async(handles=chunk) for chunk in self.chunk_list(handles, chunk_size=100)
+        ]))
 
-        edges = product_response['data']['products']['edges']
+        edges = [edge for product_response in product_responses if product_response for edge in product_response['data']['products']['edges']]
+        self._cache_product_ids([edge['node'] for edge in edges])
         files = []
         for i, edge in enumerate(edges):
             for j, variant in enumerate(edge['node']['variants']['nodes']):
@@ -2087,24 +5252,15 @@ class ShopifyApp:
 
         chunked_file_list = self.chunk_list(file_list, chunk_size=50)
         if not bulk:
-            for item in chunked_file_list:
-                file_variables = {'files': item}
-                self.update_file(file_variables)
+            self._run(self.gather_bounded([self.update_file_async({'files': item}) for item in chunked_file_list]))
         else:
             for item in chunked_file_list:
-                with open(jsonl_file_path, 'w', encoding='utf-8') as outfile:
-                    for data in item:
-                        outfile.write(json.dumps(data, ensure_ascii=False) + '\n')
+                _write_jsonl_records(item, jsonl_file_path)
                 print(f"Successfully converted file list to '{jsonl_file_path}'")
                 staged_target = self.generate_staged_target()
                 self.upload_jsonl(staged_target=staged_target, jsonl_path=jsonl_file_path)
-                self.update_files(staged_target=staged_target)
-                completed = False
-                while not completed:
-                    time.sleep(3)
-                    response = self.pool_operation_status()
-                    if response['data']['currentBulkOperation']['status'] == 'COMPLETED':
-                        completed = True
+                response = self.update_files(staged_target=staged_target)
+                self.wait_for_bulk_operation(self._bulk_operation_id(response), expected_count=self._count_lines(jsonl_file_path))
 
     def update_files_alt_text(self, csv_filepath, jsonl_file_path):
         df = pd.read_csv(csv_filepath)
@@ -2112,19 +5268,12 @@ class ShopifyApp:
         files = unique_df.to_dict('records')
         chunked_file_list = self.chunk_list(files, chunk_size=50)
         for item in chunked_file_list:
-                with open(jsonl_file_path, 'w', encoding='utf-8') as outfile:
-                    for data in item:
-                        outfile.write(json.dumps(data, ensure_ascii=False) + '\n')
+                _write_jsonl_records(item, jsonl_file_path)
                 print(f"Successfully converted file list to '{jsonl_file_path}'")
                 staged_target = self.generate_staged_target()
                 self.upload_jsonl(staged_target=staged_target, jsonl_path=jsonl_file_path)
-                self.update_files(staged_target=staged_target)
-                completed = False
-                while not completed:
-                    time.sleep(3)
-                    response = self.pool_operation_status()
-                    if response['data']['currentBulkOperation']['status'] == 'COMPLETED':
-                        completed = True
+                response = self.update_files(staged_target=staged_target)
+                self.wait_for_bulk_operation(self._bulk_operation_id(response), expected_count=self._count_lines(jsonl_file_path))
 
     # =================================== Publish Collection ================================
     def publish_collection(self, client):
@@ -2201,10 +5350,7 @@ class ShopifyApp:
     # ===================================== Update Product Description ====================================
     def bulk_update_product_descriptions(self, csv_filepath, jsonl_file_path):
         df = pd.read_csv(csv_filepath, usecols=['Handle', 'Body (HTML)', 'formatted_description'])
-        response = self.get_products_id_by_handle(handles=df['Handle'].tolist())
-        nodes = response['data']['products']['edges']
-        records = [node['node'] for node in nodes]
-        id_df = pd.DataFrame(records)
+        id_df = self._product_id_frame(handles=df['Handle'].tolist())
         df_with_id = pd.merge(df, id_df, left_on='Handle', right_on='handle', how='left')
         unique_df = df_with_id.drop_duplicates('id')
         unique_df.drop(columns=['Body (HTML)', 'handle', 'Handle'], inplace=True)
@@ -2213,50 +5359,52 @@ class ShopifyApp:
         formatted_products = [{'product': product} for product in products]
         chunked_product_list = self.chunk_list(formatted_products, chunk_size=50)
         for item in chunked_product_list:
-                with open(jsonl_file_path, 'w', encoding='utf-8') as outfile:
-                    for data in item:
-                        outfile.write(json.dumps(data, ensure_ascii=False) + '\n')
+                _write_jsonl_records(item, jsonl_file_path)
                 print(f"Successfully converted product list to '{jsonl_file_path}'")
                 staged_target = self.generate_staged_target()
                 self.upload_jsonl(staged_target=staged_target, jsonl_path=jsonl_file_path)
-                self.update_product_descriptions(staged_target=staged_target)
-                completed = False
-                while not completed:
-                    time.sleep(3)
-                    response = self.pool_operation_status()
-                    if response['data']['currentBulkOperation']['status'] == 'COMPLETED':
-                        completed = True
+                response = self.update_product_descriptions(staged_target=staged_target)
+                self.wait_for_bulk_operation(self._bulk_operation_id(response), expected_count=self._count_lines(jsonl_file_path))
 
     # Delete
     # ===================================== Product ====================================
-    def delete_products_by_handle(self, handles):
+    async def delete_products_by_handle_async(self, handles):
         print('Deleting Product...')
 
-        response = self.get_products_id_by_handle(handles=handles)
-        try:
-            found_flag = response['data']['products']['edges'][0]
-            product_ids = [item['node']['id'] for item in response['data']['products']['edges']]
-            for product_id in product_ids:
-                mutation = '''
-                    mutation productDelete($input: ProductDeleteInput!) {
-                        productDelete(input: $input) {
-                            deletedProductId
-                        }
-                    }
-                '''
+        product_ids = await self.resolve_product_ids_async(handles=handles)
+        if not product_ids:
+            print('Item Not Found')
+            return
 
-                variables = {
-                    'input': {
-                        'id': product_id
-                    }
+        mutation = '''
+            mutation productDelete($input: ProductDeleteInput!) {
+                productDelete(input: $input) {
+                    deletedProductId
                 }
+            }
+        '''
+
+        tasks = []
+        for product_id in product_ids.values():
+            variables = {
+                'input': {
+                    'id': product_id
+                }
+            }
 
-                self.send_request(query=mutation, variables=variables)
+            tasks.append(self.send_request_async(query=mutation, variables=variables))
 
-        except IndexError:
-            print('Item Not Found')
+        await self.gather_bounded(tasks)
 
-    def remove_tags(self, product_id, tags):
+        # Deleted handles must not resolve to stale ids on the next import
+        self._get_handle_cache().delete_handles(handles)
+        if self.catalog is not None:
+            self.catalog.delete_handles(handles)
+
+    def delete_products_by_handle(self, handles):
+        return self._run(self.delete_products_by_handle_async(handles=handles))
+
+    async def remove_tags_async(self, product_id, tags):
         print("Removing Tags...")
         mutation = '''
             mutation removeTags($id: ID!, $tags: [String!]!) {
@@ -2275,7 +5423,10 @@ class ShopifyApp:
             "tags": tags
         }
 
-        return self.send_request(query=mutation, variables=remove_tags_variables)
+        return await self.send_request_async(query=mutation, variables=remove_tags_variables)
+
+    def remove_tags(self, product_id, tags):
+        return self._run(self.remove_tags_async(product_id=product_id, tags=tags))
 
 
 if __name__ == '__main__':
@@ -2527,6 +5678,9 @@ if __name__ == '__main__':
     # s.import_bulk_data(csv_file_path='./data/import201_test.csv', jsonl_file_path='./data/bulk_op_vars.jsonl', locationId='gid://shopify/Location/76200411326')
     # s.import_bulk_data(csv_file_path='./data/import201_test.csv', jsonl_file_path='./data/bulk_op_vars.jsonl', locationId='gid://shopify/Location/47387978') # prod
 
+    # =============================== bulk import chunks =============================
+    # s.run_bulk_pipeline(chunk_directory='./data/chunked', jsonl_directory='./data/chunked_jsonl', mode='import', locationId='gid://shopify/Location/76200411326')
+
     # =============================== Update Files =============================
     # s.update_files_for_import(csv_file_path='./data/_chunk_3.csv', jsonl_file_path='./data/bulk_op_vars.jsonl', bulk=False)
 
@@ -2567,19 +5721,9 @@ if __name__ == '__main__':
     # df.to_csv('data/uploaded_data.csv', index=False)
 
     # ======================================= Get Products by date =======================================
-    # records = []
     # var_query = {'query': "created_at:>'2025-08-15T04:24:54Z'"}
     # # var_query = {'query': "created_at:>'2025-09-04T00:00:00Z'"}
-    # cursor = None
-    # has_next_page = True
-
-    # while has_next_page:
-    #     response = s.get_products_with_pagination(variable_query=var_query, after=cursor)
-    #     edges = response['data']['products']['edges']
-    #     record = [i['node'] for i in edges]
-    #     records.extend(record)
-    #     has_next_page = response['data']['products']['pageInfo']['hasNextPage']
-    #     cursor = response['data']['products']['pageInfo']['endCursor']
+    # records = s.iter_products_with_pagination(variable_query=var_query)
 
     # df = pd.DataFrame.from_records(records)
     # df.to_csv('data/uploaded_data.csv', index=False)
@@ -2605,8 +5749,16 @@ if __name__ == '__main__':
 
     # df.to_csv('data/active_products_with_inventory.csv', index=False)
 
+    # Or stream straight to disk without holding the catalog in memory
+    # s.export_products_with_filter(csv_file_path='data/active_products_with_inventory.csv', filters={'inventory_total': '>0'})
+
+    # Or export the full catalog through a bulk query
+    # s.export_products_bulk(csv_file_path='data/active_products_with_inventory.csv', filters={'inventory_total': '>0'})
+
     # =================================== Bulk Update Products ==================================
     # df = pd.read_csv('data/active_products_with_inventory.csv')
+    # Or answer it from the local catalog mirror (s.sync_catalog() once, then kept fresh by product reads)
+    # df = s.catalog_dataframe()
     # active_products = df[df['Status'] == 'ACTIVE']
 
     # available_products = df[(pd.isna(df['Variant Inventory Tracker'])) | ((df['Variant Inventory Tracker'] == 'shopify') & (df['Available Qty'] > 0))]
@@ -2622,18 +5774,10 @@ if __name__ == '__main__':
     # s.update_products_bulk(csv_file_path='data/chunked_available_products/available_products_001.csv', jsonl_file_path='./data/bulk_op_vars.jsonl')
 
     # =================================== Get Files by date =======================================
-    # records = []
     # updated_at = '2025-12-15T00:00:00Z'
     # created_at = '2000-12-03T00:00:00Z'
-    # cursor = ''
-    # hasNextPage = True
-    # while hasNextPage:
-    #     data = s.get_file(updated_at=updated_at, created_at=created_at, after=cursor)
-    #     file_records = data['data']['files']['edges']
-    #     records.extend(file_records)
-    #     hasNextPage = data['data']['files']['pageInfo']['hasNextPage']
-    #     cursor = data['data']['files']['pageInfo']['endCursor']
-    # df = pd.DataFrame.from_records([i['node'] for i in records])
+    # records = s.iter_files(updated_at=updated_at, created_at=created_at)
+    # df = pd.DataFrame.from_records(records)
     # df.to_csv('/home/harits/Projects/magiccars/data/sources/all_files.csv', index=False)
     
     # =================================== Update Files Alt Text =======================================